@@ -1,10 +1,13 @@
 import discord
 from discord import app_commands
+from discord.http import Route
 import logging
 import asyncio
+from typing import Optional
 from config import Config
 from database import Database
 from cogs.scores import ScoresCog
+from verification import VerificationQueue
 
 def setup_logging():
     """Initialize logging configuration"""
@@ -19,6 +22,19 @@ class BeatSaberBot(discord.Client):
         super().__init__(intents=discord.Intents.default())
         self.tree = app_commands.CommandTree(self)
         self.db = Database()
+        self.verifier = VerificationQueue(self.db, url_refresher=self._refresh_attachment_url)
+
+    async def _refresh_attachment_url(self, url: str) -> Optional[str]:
+        """Ask Discord for a freshly signed URL for an expired attachment URL"""
+        try:
+            data = await self.http.request(
+                Route('POST', '/attachments/refresh-urls'), json={'attachment_urls': [url]}
+            )
+        except discord.HTTPException as e:
+            logging.warning(f"Could not refresh attachment URL: {e}")
+            return None
+        refreshed = data.get('refreshed_urls') or []
+        return refreshed[0].get('refreshed') if refreshed else None
 
     async def setup_hook(self):
         try:
@@ -29,9 +45,12 @@ class BeatSaberBot(discord.Client):
             levels = self.db.get_levels()
             if not levels:
                 from init_beat_saber_levels import init_beat_saber_levels
-                init_beat_saber_levels('beat_saber_levels.csv')
+                init_beat_saber_levels(Config.LEVEL_CATALOG_FILE, self.db)
                 logging.info("Initialized levels from CSV")
             
+            # Start background verification of score attachments
+            self.verifier.start()
+            
             # Add commands from cog
             scores_cog = ScoresCog(self)
             for command in scores_cog.get_app_commands():
@@ -39,6 +58,9 @@ class BeatSaberBot(discord.Client):
             
             # Start automatic backup task
             self.loop.create_task(self._auto_backup())
+            
+            # Start task that freezes seasons once their window has ended
+            self.loop.create_task(self._auto_close_seasons())
         except Exception as e:
             logging.error(f"Error in setup_hook: {e}")
             raise
@@ -53,6 +75,21 @@ class BeatSaberBot(discord.Client):
             except Exception as e:
                 logging.error(f"Error during automatic backup: {e}")
 
+    async def _auto_close_seasons(self):
+        """Close expired seasons, checking every hour"""
+        while True:
+            try:
+                closed = self.db.close_expired_seasons()
+                if closed:
+                    logging.info(f"Automatically closed seasons: {', '.join(closed)}")
+            except Exception as e:
+                logging.error(f"Error closing expired seasons: {e}")
+            await asyncio.sleep(60 * 60)  # 1 hour
+
+    async def close(self):
+        await self.verifier.stop()
+        await super().close()
+
     def __del__(self):
         if hasattr(self, 'db'):
             self.db.close()
@@ -1,17 +1,21 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from typing import Literal
+from typing import Literal, Optional
+from datetime import datetime, timedelta, timezone
 import logging
 from database import Database
-from constants import Difficulty, ScoreLimits
+from constants import Difficulty, ScoreLimits, VerificationStatus
 from utils.formatters import (
     create_score_embeds, 
     create_leaderboard_embed,
     create_level_choices,
-    create_difficulty_choices
+    create_difficulty_choices,
+    create_season_choices
 )
 from config import Config
+from verification import VerificationError, VerificationQueue
+import level_catalog
 
 class ScoresCog(commands.Cog):
     def __init__(self, bot):
@@ -23,12 +27,14 @@ class ScoresCog(commands.Cog):
     @app_commands.describe(
         level="Name of the level",
         difficulty="Difficulty of the level",
-        score="Your score for the level (0 to 3,000,000)"
+        score="Your score for the level (0 to 3,000,000)",
+        proof="Optional screenshot or replay file to verify the score"
     )
     async def score(self, interaction: discord.Interaction, 
                    level: str,
                    difficulty: str,
-                   score: int):
+                   score: int,
+                   proof: Optional[discord.Attachment] = None):
         if not Config.is_allowed_channel(interaction.channel_id):
             await interaction.response.send_message(
                 "This command can only be used in designated channels.", 
@@ -62,16 +68,40 @@ class ScoresCog(commands.Cog):
             )
             return
 
-        # Insert score
-        self.db.insert_score(
-            str(interaction.user.id),
-            interaction.user.name,
-            matched_level[0],
-            difficulty,
-            score
-        )
+        # Validate the attachment before accepting the submission
+        if proof:
+            try:
+                VerificationQueue.check_attachment(proof)
+            except VerificationError as e:
+                await interaction.response.send_message(str(e), ephemeral=True)
+                return
+
+        # Insert score, holding it back until the proof is verified if one was attached
+        if proof:
+            self.db.insert_pending_score(
+                str(interaction.user.id),
+                interaction.user.name,
+                matched_level[0],
+                difficulty,
+                score,
+                str(proof.id),
+                proof.url,
+                VerificationQueue.attachment_extension(proof)
+            )
+        else:
+            self.db.insert_score(
+                str(interaction.user.id),
+                interaction.user.name,
+                matched_level[0],
+                difficulty,
+                score
+            )
         
         response = f"Score of {score:,} recorded for {matched_level[1]} ({difficulty})."
+        if proof:
+            # Verification runs in the background so the interaction is answered right away
+            self.bot.verifier.submit(proof)
+            response += " It will appear on the leaderboard once your proof has been verified."
         await interaction.response.send_message(response, ephemeral=True)
         
         log_message = f"Score submitted: {interaction.user.name} - {matched_level[1]} ({difficulty}): {score}"
@@ -90,11 +120,15 @@ class ScoresCog(commands.Cog):
     @app_commands.command(name="leaderboard", description="Show leaderboard for a specific level")
     @app_commands.describe(
         level="Name of the level",
-        difficulty="Difficulty of the level"
+        difficulty="Difficulty of the level",
+        verified_only="Only show scores with a verified screenshot or replay",
+        season="Show the leaderboard for a season instead of all-time"
     )
     async def leaderboard(self, interaction: discord.Interaction,
                          level: str,
-                         difficulty: Literal['Easy', 'Normal', 'Hard', 'Expert', 'Expert+']):
+                         difficulty: Literal['Easy', 'Normal', 'Hard', 'Expert', 'Expert+'],
+                         verified_only: bool = False,
+                         season: Optional[str] = None):
         if not Config.is_allowed_channel(interaction.channel_id):
             await interaction.response.send_message(
                 "This command can only be used in designated channels.", 
@@ -103,19 +137,37 @@ class ScoresCog(commands.Cog):
             return
 
         try:
-            levels = self.db.get_levels()
+            matched_season = None
+            if season:
+                matched_season = self.db.get_season_by_name(season)
+                if not matched_season:
+                    await interaction.response.send_message(f"Season '{season}' not found.")
+                    return
+                # Closed seasons resolve levels from their snapshot, so renamed or retired levels still match
+                levels = self.db.get_season_levels(matched_season)
+            else:
+                levels = self.db.get_levels()
             matched_level = next((l for l in levels if l[1] == level), None)
             if not matched_level:
-                await interaction.response.send_message(f"Level '{level}' not found.")
+                if matched_season:
+                    await interaction.response.send_message(
+                        f"Level '{level}' is not part of season '{season}'."
+                    )
+                else:
+                    await interaction.response.send_message(f"Level '{level}' not found.")
                 return
 
             # Debug logging
             logging.info(f"Fetching leaderboard for level: {level} (ID: {matched_level[0]}) - {difficulty}")
             
-            scores = self.db.get_level_leaderboard(matched_level[0], difficulty)
+            statuses = [VerificationStatus.VERIFIED.value] if verified_only else None
+            if matched_season:
+                scores = self.db.get_season_leaderboard(matched_season, matched_level[0], difficulty, statuses)
+            else:
+                scores = self.db.get_level_leaderboard(matched_level[0], difficulty, statuses)
             logging.info(f"Found {len(scores)} scores for {level} ({difficulty})")
             
-            embed = create_leaderboard_embed(matched_level[1], difficulty, scores)
+            embed = create_leaderboard_embed(matched_level[1], difficulty, scores, season)
             await interaction.response.send_message(embed=embed)
             logging.info(f"Level leaderboard displayed: {matched_level[1]} ({difficulty})")
             
@@ -130,12 +182,27 @@ class ScoresCog(commands.Cog):
     async def leaderboard_level_autocomplete(self, interaction: discord.Interaction, current: str):
         if not Config.is_allowed_channel(interaction.channel_id):
             return []
+        # Once a season is picked, offer that season's levels instead of the current catalog
+        season = getattr(interaction.namespace, 'season', None)
+        matched_season = self.db.get_season_by_name(season) if season else None
+        if matched_season:
+            return create_level_choices(self.db.get_season_levels(matched_season), current)
         return create_level_choices(self.db.get_levels(), current)
 
+    @leaderboard.autocomplete('season')
+    async def leaderboard_season_autocomplete(self, interaction: discord.Interaction, current: str):
+        if not Config.is_allowed_channel(interaction.channel_id):
+            return []
+        return create_season_choices(self.db.get_seasons(), current)
+
     @app_commands.command(name="my_scores", description="View your scores for all levels")
-    @app_commands.describe(visibility="Choose whether to display scores publicly or privately")
+    @app_commands.describe(
+        visibility="Choose whether to display scores publicly or privately",
+        season="Only show your scores from a season"
+    )
     async def my_scores(self, interaction: discord.Interaction, 
-                       visibility: Literal['Public', 'Private'] = 'Private'):
+                       visibility: Literal['Public', 'Private'] = 'Private',
+                       season: Optional[str] = None):
         if not Config.is_allowed_channel(interaction.channel_id):
             await interaction.response.send_message(
                 "This command can only be used in designated channels.", 
@@ -145,7 +212,14 @@ class ScoresCog(commands.Cog):
 
         try:
             # Use the shared database connection
-            user_scores = self.db.get_user_scores(str(interaction.user.id))
+            if season:
+                matched_season = self.db.get_season_by_name(season)
+                if not matched_season:
+                    await interaction.response.send_message(f"Season '{season}' not found.", ephemeral=True)
+                    return
+                user_scores = self.db.get_user_season_scores(matched_season, str(interaction.user.id))
+            else:
+                user_scores = self.db.get_user_scores(str(interaction.user.id))
             
             # Debug logging
             logging.info(f"Retrieved scores for {interaction.user.name}: {len(user_scores)} scores found")
@@ -157,7 +231,7 @@ class ScoresCog(commands.Cog):
                 )
                 return
 
-            embeds = create_score_embeds(interaction.user.name, user_scores)
+            embeds = create_score_embeds(interaction.user.name, user_scores, season=season)
             
             await interaction.response.send_message(
                 embed=embeds[0], 
@@ -178,9 +252,19 @@ class ScoresCog(commands.Cog):
                 ephemeral=True
             )
 
+    @my_scores.autocomplete('season')
+    async def my_scores_season_autocomplete(self, interaction: discord.Interaction, current: str):
+        if not Config.is_allowed_channel(interaction.channel_id):
+            return []
+        return create_season_choices(self.db.get_seasons(), current)
+
     @app_commands.command(name="check_user_scores", description="Check a specific user's scores (Admin only)")
-    @app_commands.describe(user_name="Select a user to view their scores")
-    async def check_user_scores(self, interaction: discord.Interaction, user_name: str):
+    @app_commands.describe(
+        user_name="Select a user to view their scores",
+        season="Only show the user's scores from a season"
+    )
+    async def check_user_scores(self, interaction: discord.Interaction, user_name: str,
+                                season: Optional[str] = None):
         if not interaction.user.guild_permissions.administrator:
             await interaction.response.send_message(
                 "You don't have permission to use this command.", 
@@ -188,21 +272,42 @@ class ScoresCog(commands.Cog):
             )
             return
 
-        # Get all scores for the user
-        user_scores = self.db.get_user_scores_by_name(user_name)
+        matched_season = None
+        if season:
+            matched_season = self.db.get_season_by_name(season)
+            if not matched_season:
+                await interaction.response.send_message(f"Season '{season}' not found.", ephemeral=True)
+                return
+
+        # Autocomplete passes the user_id, so renamed players resolve to the same person
+        user_id = self.db.resolve_user_id(user_name)
+        if not user_id:
+            user_scores = []
+        elif matched_season:
+            user_scores = [
+                (level_id, difficulty, score) 
+                for level_id, _, difficulty, score in self.db.get_user_season_scores(matched_season, user_id)
+            ]
+        else:
+            user_scores = self.db.get_user_scores_by_id(user_id)
         if not user_scores:
             await interaction.response.send_message(
                 f"No scores found for user {user_name}.", 
                 ephemeral=True
             )
             return
+        user_name = self.db.user_names.get(user_id)
 
         # Create a lookup dictionary for quick score access
         scores_dict = {(level_id, difficulty): score 
                       for level_id, difficulty, score in user_scores}
 
         # Get all levels for complete display
-        levels = self.db.get_levels()
+        if matched_season:
+            levels = self.db.get_season_levels(matched_season)
+            user_name = f"{user_name} - {season}"
+        else:
+            levels = self.db.get_levels()
         
         # Create embeds with scores organized by level
         embeds = []
@@ -248,10 +353,192 @@ class ScoresCog(commands.Cog):
         if not interaction.user.guild_permissions.administrator:
             return []
         return [
-            app_commands.Choice(name=name, value=name)
-            for name in self.db.get_unique_users()
-            if current.lower() in name.lower()
-        ][:25]  # Discord limit
+            app_commands.Choice(name=name, value=user_id)
+            for user_id, name in self.db.user_names.search(current, limit=25)  # Discord limit
+        ]
+
+    @check_user_scores.autocomplete('season')
+    async def check_user_scores_season_autocomplete(self, interaction: discord.Interaction, current: str):
+        if not interaction.user.guild_permissions.administrator:
+            return []
+        return create_season_choices(self.db.get_seasons(), current)
+
+    @app_commands.command(name="sync_levels", description="Sync the level list with the level catalog (Admin only)")
+    @app_commands.describe(
+        source="Optional CSV or JSON level list to use instead of the configured catalog file",
+        dry_run="Only show the changes without applying them",
+        retire_missing="Retire levels that are missing from the source",
+        force="Allow retiring a large part of the level list"
+    )
+    async def sync_levels(self, interaction: discord.Interaction,
+                          source: Optional[discord.Attachment] = None,
+                          dry_run: bool = False,
+                          retire_missing: bool = True,
+                          force: bool = False):
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message(
+                "You don't have permission to use this command.", 
+                ephemeral=True
+            )
+            return
+
+        try:
+            if source:
+                source_format = source.filename.rsplit('.', 1)[-1].lower()
+                levels = level_catalog.parse_source((await source.read()).decode('utf-8'), source_format)
+            else:
+                levels = level_catalog.load_source(Config.LEVEL_CATALOG_FILE)
+            diff = level_catalog.sync_levels(self.db, levels, retire_missing, dry_run, force)
+        except (level_catalog.RetireLimitError, level_catalog.LevelConflictError) as e:
+            await interaction.response.send_message(f"Sync refused: {e}", ephemeral=True)
+            return
+        except (level_catalog.CatalogError, UnicodeDecodeError, OSError) as e:
+            await interaction.response.send_message(f"Could not read the level list: {e}", ephemeral=True)
+            return
+        except Exception as e:
+            error_msg = f"Failed to sync levels: {str(e)}"
+            logging.error(error_msg)
+            await interaction.response.send_message(error_msg, ephemeral=True)
+            return
+
+        summary = diff.summary()
+        if dry_run:
+            summary = "Dry run, no changes applied.\n" + summary
+        if len(summary) > 1900:  # Discord's message limit is 2000 characters
+            summary = summary[:1900] + "\n..."
+        await interaction.response.send_message(summary, ephemeral=True)
+        logging.info(f"Admin {interaction.user.name} synced levels (dry run: {dry_run})")
+
+    @app_commands.command(name="season_create", description="Create a season or event (Admin only)")
+    @app_commands.describe(
+        name="Name of the season",
+        start_date="First day of the season (YYYY-MM-DD, UTC)",
+        end_date="Last day of the season (YYYY-MM-DD, UTC)"
+    )
+    async def season_create(self, interaction: discord.Interaction, 
+                            name: str, start_date: str, end_date: str):
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message(
+                "You don't have permission to use this command.", 
+                ephemeral=True
+            )
+            return
+
+        try:
+            starts_at = datetime.strptime(start_date, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+            # The end date is inclusive, so the window closes at midnight after it
+            ends_at = datetime.strptime(end_date, '%Y-%m-%d').replace(tzinfo=timezone.utc) + timedelta(days=1)
+        except ValueError:
+            await interaction.response.send_message(
+                "Invalid date. Please use the format YYYY-MM-DD.", 
+                ephemeral=True
+            )
+            return
+
+        if ends_at <= starts_at:
+            await interaction.response.send_message(
+                "The end date must not be before the start date.", 
+                ephemeral=True
+            )
+            return
+
+        if self.db.create_season(name, starts_at, ends_at) is None:
+            await interaction.response.send_message(f"Season '{name}' already exists.", ephemeral=True)
+            return
+
+        await interaction.response.send_message(
+            f"Season '{name}' created ({start_date} to {end_date}). Add levels with /season_add_level.", 
+            ephemeral=True
+        )
+        logging.info(f"Admin {interaction.user.name} created season {name}")
+
+    @app_commands.command(name="season_add_level", description="Add a level to a season (Admin only)")
+    @app_commands.describe(
+        season="Name of the season",
+        level="Name of the level"
+    )
+    async def season_add_level(self, interaction: discord.Interaction, season: str, level: str):
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message(
+                "You don't have permission to use this command.", 
+                ephemeral=True
+            )
+            return
+
+        matched_season = self.db.get_season_by_name(season)
+        if not matched_season:
+            await interaction.response.send_message(f"Season '{season}' not found.", ephemeral=True)
+            return
+        if matched_season[4]:
+            await interaction.response.send_message(
+                f"Season '{season}' is closed and can no longer be changed.", 
+                ephemeral=True
+            )
+            return
+
+        levels = self.db.get_levels()
+        matched_level = next((l for l in levels if l[1] == level), None)
+        if not matched_level:
+            await interaction.response.send_message(
+                "Invalid level name. Please select a level from the autocomplete menu.", 
+                ephemeral=True
+            )
+            return
+
+        if self.db.add_season_level(matched_season[0], matched_level[0]):
+            response = f"{matched_level[1]} added to season '{season}'."
+        else:
+            response = f"{matched_level[1]} is already part of season '{season}'."
+        await interaction.response.send_message(response, ephemeral=True)
+        logging.info(f"Admin {interaction.user.name} added {matched_level[1]} to season {season}")
+
+    @season_add_level.autocomplete('season')
+    async def season_add_level_season_autocomplete(self, interaction: discord.Interaction, current: str):
+        if not interaction.user.guild_permissions.administrator:
+            return []
+        return create_season_choices([s for s in self.db.get_seasons() if not s[4]], current)
+
+    @season_add_level.autocomplete('level')
+    async def season_add_level_level_autocomplete(self, interaction: discord.Interaction, current: str):
+        if not interaction.user.guild_permissions.administrator:
+            return []
+        return create_level_choices(self.db.get_levels(), current)
+
+    @app_commands.command(name="season_close", description="Close a season and freeze its results (Admin only)")
+    @app_commands.describe(season="Name of the season")
+    async def season_close(self, interaction: discord.Interaction, season: str):
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message(
+                "You don't have permission to use this command.", 
+                ephemeral=True
+            )
+            return
+
+        matched_season = self.db.get_season_by_name(season)
+        if not matched_season:
+            await interaction.response.send_message(f"Season '{season}' not found.", ephemeral=True)
+            return
+        if matched_season[4]:
+            await interaction.response.send_message(f"Season '{season}' is already closed.", ephemeral=True)
+            return
+
+        try:
+            self.db.close_season(matched_season[0])
+            await interaction.response.send_message(
+                f"Season '{season}' closed. Its results are now final.", 
+                ephemeral=True
+            )
+            logging.info(f"Admin {interaction.user.name} closed season {season}")
+        except Exception as e:
+            error_msg = f"Failed to close season: {str(e)}"
+            logging.error(error_msg)
+            await interaction.response.send_message(error_msg, ephemeral=True)
+
+    @season_close.autocomplete('season')
+    async def season_close_season_autocomplete(self, interaction: discord.Interaction, current: str):
+        if not interaction.user.guild_permissions.administrator:
+            return []
+        return create_season_choices([s for s in self.db.get_seasons() if not s[4]], current)
 
     @app_commands.command(name="backup_now", description="Create a database backup (Admin only)")
     async def backup_now(self, interaction: discord.Interaction):
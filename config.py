@@ -17,6 +17,13 @@ class Config:
     DB_NAME = os.getenv('DB_NAME', 'beat_saber_scores.db')
     BACKUP_FOLDER = os.getenv('BACKUP_FOLDER', 'backups')
 
+    # Level catalog used by /sync_levels and level_catalog.py
+    LEVEL_CATALOG_FILE = os.getenv('LEVEL_CATALOG_FILE', 'beat_saber_levels.csv')
+
+    # Score verification settings
+    ATTACHMENT_FOLDER = os.getenv('ATTACHMENT_FOLDER', 'attachments')
+    VERIFICATION_WORKERS = int(os.getenv('VERIFICATION_WORKERS', '2'))
+
     # Logging settings
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     LOG_FILE = os.getenv('LOG_FILE', 'bot.log')
@@ -29,3 +36,8 @@ class Config:
     def ensure_backup_folder(cls) -> None:
         if not os.path.exists(cls.BACKUP_FOLDER):
             os.makedirs(cls.BACKUP_FOLDER)
+
+    @classmethod
+    def ensure_attachment_folder(cls) -> None:
+        if not os.path.exists(cls.ATTACHMENT_FOLDER):
+            os.makedirs(cls.ATTACHMENT_FOLDER)
@@ -18,3 +18,27 @@ class ScoreLimits:
 class EmbedLimits:
     FIELDS_PER_EMBED = 25
     COLOR = 0x00ff00  # Green color for embeds
+
+class VerificationStatus(Enum):
+    UNVERIFIED = "unverified"  # Submitted without a screenshot or replay
+    PENDING = "pending"
+    VERIFIED = "verified"
+    REJECTED = "rejected"
+
+    @classmethod
+    def list(cls) -> list[str]:
+        return [status.value for status in cls]
+
+class AttachmentLimits:
+    MAX_BYTES = 25 * 1024 * 1024  # Discord's default upload limit
+    CHUNK_SIZE = 64 * 1024
+    EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bsor')
+
+class DownloadRetry:
+    BASE_DELAY = 30  # Seconds before the first retry of a failed download, doubled each attempt
+    MAX_DELAY = 60 * 60
+    MAX_ATTEMPTS = 8  # After this the submission stays pending until the next restart
+    EXPIRED_STATUSES = (403, 404, 410)  # Discord answers these once a signed attachment URL has expired
+
+class CatalogLimits:
+    MAX_RETIRED_FRACTION = 0.2  # Retiring more of the active levels than this needs force
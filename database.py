@@ -1,19 +1,28 @@
 import sqlite3
 import logging
 from typing import List, Tuple, Optional, Dict
-from datetime import datetime
+from datetime import datetime, timezone
 import shutil
 import os
 from config import Config
+from constants import VerificationStatus
+from utils.name_cache import UserNameCache
 
 class DatabaseError(Exception):
     """Custom exception for database errors"""
     pass
 
+def _timestamp(moment: Optional[datetime] = None) -> str:
+    """Format a UTC time so that timestamps compare correctly as strings"""
+    return (moment or datetime.now(timezone.utc)).strftime('%Y-%m-%d %H:%M:%S')
+
 class Database:
     def __init__(self, db_name: str = Config.DB_NAME):
         self.db_name = db_name
         self.conn = None
+        self.user_names = UserNameCache()
+        self._levels: Optional[List[Tuple]] = None
+        self._levels_version: Optional[int] = None
         self._connect()
 
     def _connect(self):
@@ -40,7 +49,7 @@ class Database:
         try:
             cursor = self.conn.cursor()
             cursor.execute(query, params)
-            if query.lower().startswith('select'):
+            if query.lstrip().lower().startswith('select'):
                 result = cursor.fetchall()
                 self.conn.commit()
                 return result
@@ -74,9 +83,25 @@ class Database:
             self.execute('''
                 CREATE TABLE IF NOT EXISTS levels (
                     level_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    level_name TEXT UNIQUE NOT NULL
+                    level_name TEXT NOT NULL,
+                    level_key TEXT,
+                    retired INTEGER NOT NULL DEFAULT 0
                 )
             ''')
+
+            self._migrate_levels_catalog()
+
+            # Names only need to be unique among active levels, so a retired level's name can be reused
+            self.execute('''
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_levels_active_name
+                ON levels (level_name) WHERE retired = 0
+            ''')
+
+            # Stable IDs from catalog sources, such as map hashes
+            self.execute('''
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_levels_key
+                ON levels (level_key) WHERE level_key IS NOT NULL
+            ''')
             
             self.execute('''
                 CREATE TABLE IF NOT EXISTS scores (
@@ -85,16 +110,247 @@ class Database:
                     level_id INTEGER,
                     difficulty TEXT,
                     score INTEGER,
+                    verification_status TEXT NOT NULL DEFAULT 'unverified',
+                    attachment_id TEXT,
+                    attachment_hash TEXT,
                     PRIMARY KEY (user_id, level_id, difficulty),
                     FOREIGN KEY (level_id) REFERENCES levels(level_id)
                 )
             ''')
+
+            self._migrate_scores_verification()
+
+            # Leaderboards filter on verification status, duplicate detection looks up hashes
+            self.execute('''
+                CREATE INDEX IF NOT EXISTS idx_scores_leaderboard
+                ON scores (level_id, difficulty, verification_status, score DESC)
+            ''')
+            self.execute('''
+                CREATE INDEX IF NOT EXISTS idx_scores_attachment_hash
+                ON scores (attachment_hash)
+            ''')
+
+            # Submissions with proof wait here, so a player's current score stays until the proof passes
+            self.execute('''
+                CREATE TABLE IF NOT EXISTS pending_scores (
+                    attachment_id TEXT PRIMARY KEY,
+                    user_id TEXT,
+                    user_name TEXT,
+                    level_id INTEGER,
+                    difficulty TEXT,
+                    score INTEGER,
+                    attachment_url TEXT NOT NULL,
+                    attachment_extension TEXT NOT NULL,
+                    verification_status TEXT NOT NULL DEFAULT 'pending',
+                    attachment_hash TEXT,
+                    submitted_at TEXT,
+                    FOREIGN KEY (level_id) REFERENCES levels(level_id)
+                )
+            ''')
+            self.execute('''
+                CREATE INDEX IF NOT EXISTS idx_pending_scores_status
+                ON pending_scores (verification_status)
+            ''')
+            self.execute('''
+                CREATE INDEX IF NOT EXISTS idx_pending_scores_attachment_hash
+                ON pending_scores (attachment_hash)
+            ''')
+            
+            # Current name per player, so a rename is one row update instead of rewriting scores
+            self.execute('''
+                CREATE TABLE IF NOT EXISTS user_names (
+                    user_id TEXT PRIMARY KEY,
+                    user_name TEXT NOT NULL,
+                    updated_at TEXT
+                )
+            ''')
+
+            # Backfill from the name on each player's most recently written score
+            self.execute('''
+                INSERT OR IGNORE INTO user_names (user_id, user_name)
+                SELECT s.user_id, s.user_name
+                FROM scores s
+                WHERE s.rowid = (SELECT MAX(rowid) FROM scores WHERE user_id = s.user_id)
+            ''')
+
+            self.user_names.load(self.execute('SELECT user_id, user_name FROM user_names'))
+
+            self._init_season_tables()
             
             logging.info("Database initialization completed successfully")
         except Exception as e:
             logging.error(f"Failed to initialize database: {e}")
             raise
 
+    def _init_season_tables(self) -> None:
+        """Create tables for time-windowed seasons and their frozen results"""
+        self.execute('''
+            CREATE TABLE IF NOT EXISTS seasons (
+                season_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                season_name TEXT UNIQUE NOT NULL,
+                starts_at TEXT NOT NULL,
+                ends_at TEXT NOT NULL,
+                closed INTEGER NOT NULL DEFAULT 0,
+                closed_at TEXT
+            )
+        ''')
+
+        self.execute('''
+            CREATE TABLE IF NOT EXISTS season_levels (
+                season_id INTEGER,
+                level_id INTEGER,
+                PRIMARY KEY (season_id, level_id),
+                FOREIGN KEY (season_id) REFERENCES seasons(season_id),
+                FOREIGN KEY (level_id) REFERENCES levels(level_id)
+            )
+        ''')
+
+        # Best score per player while a season is open
+        self.execute('''
+            CREATE TABLE IF NOT EXISTS season_scores (
+                season_id INTEGER,
+                user_id TEXT,
+                level_id INTEGER,
+                difficulty TEXT,
+                score INTEGER,
+                verification_status TEXT NOT NULL DEFAULT 'unverified',
+                attachment_id TEXT,
+                submitted_at TEXT,
+                PRIMARY KEY (season_id, user_id, level_id, difficulty),
+                FOREIGN KEY (season_id) REFERENCES seasons(season_id)
+            )
+        ''')
+        self.execute('''
+            CREATE INDEX IF NOT EXISTS idx_season_scores_leaderboard
+            ON season_scores (season_id, level_id, difficulty, verification_status, score DESC)
+        ''')
+        self.execute('''
+            CREATE INDEX IF NOT EXISTS idx_season_scores_attachment
+            ON season_scores (attachment_id)
+        ''')
+
+        # Read-only snapshot written once when a season closes. Level names are copied in
+        # so later renames or retirements in the levels table don't change historical results
+        self.execute('''
+            CREATE TABLE IF NOT EXISTS season_results (
+                season_id INTEGER,
+                level_id INTEGER,
+                level_name TEXT,
+                difficulty TEXT,
+                user_id TEXT,
+                user_name TEXT,
+                score INTEGER,
+                verification_status TEXT,
+                PRIMARY KEY (season_id, level_id, difficulty, user_id),
+                FOREIGN KEY (season_id) REFERENCES seasons(season_id)
+            )
+        ''')
+        self.execute('''
+            CREATE TABLE IF NOT EXISTS season_result_levels (
+                season_id INTEGER,
+                level_id INTEGER,
+                level_name TEXT NOT NULL,
+                PRIMARY KEY (season_id, level_id),
+                FOREIGN KEY (season_id) REFERENCES seasons(season_id)
+            )
+        ''')
+        self._migrate_season_snapshots()
+        self.execute('''
+            CREATE INDEX IF NOT EXISTS idx_season_results_leaderboard
+            ON season_results (season_id, level_id, difficulty, verification_status, score DESC)
+        ''')
+        self.execute('''
+            CREATE INDEX IF NOT EXISTS idx_season_results_user
+            ON season_results (season_id, user_id)
+        ''')
+
+    def _migrate_season_snapshots(self) -> None:
+        """Bring season data written by earlier versions in line with the current rules"""
+        season_columns = {row[0] for row in self.execute("SELECT name FROM pragma_table_info('seasons')")}
+        if 'closed_at' not in season_columns:
+            # Seasons closed before this column existed count as closed at the end of their window
+            self.execute("ALTER TABLE seasons ADD COLUMN closed_at TEXT")
+            self.execute("UPDATE seasons SET closed_at = ends_at WHERE closed = 1")
+            logging.info("Added closed_at column to seasons table")
+
+        columns = {row[0] for row in self.execute("SELECT name FROM pragma_table_info('season_results')")}
+        if 'level_name' not in columns:
+            self.execute("ALTER TABLE season_results ADD COLUMN level_name TEXT")
+            self.execute('''
+                UPDATE season_results 
+                SET level_name = (SELECT level_name FROM levels WHERE levels.level_id = season_results.level_id)
+            ''')
+            logging.info("Added level_name column to season_results table")
+
+        # Closed seasons from before season_result_levels existed
+        self.execute('''
+            INSERT OR IGNORE INTO season_result_levels (season_id, level_id, level_name)
+            SELECT sl.season_id, sl.level_id, l.level_name
+            FROM season_levels sl
+            JOIN seasons s ON sl.season_id = s.season_id
+            JOIN levels l ON sl.level_id = l.level_id
+            WHERE s.closed = 1
+        ''')
+
+        # Season entries now only hold checked or proof-less scores, never pending or rejected ones
+        self.execute("UPDATE season_scores SET verification_status = 'unverified' WHERE verification_status = 'pending'")
+        self.execute("DELETE FROM season_scores WHERE verification_status = 'rejected'")
+
+    def _migrate_levels_catalog(self) -> None:
+        """Add catalog sync columns to level tables created before they existed"""
+        columns = {row[0] for row in self.execute("SELECT name FROM pragma_table_info('levels')")}
+        if 'level_key' not in columns:
+            self.execute("ALTER TABLE levels ADD COLUMN level_key TEXT")
+            logging.info("Added level_key column to levels table")
+        if 'retired' not in columns:
+            self.execute("ALTER TABLE levels ADD COLUMN retired INTEGER NOT NULL DEFAULT 0")
+
+        # Older tables declare level_name UNIQUE, which SQLite can only drop by rebuilding the table
+        unique_indexes = [row for row in self.execute("SELECT origin FROM pragma_index_list('levels')") if row[0] == 'u']
+        if unique_indexes:
+            self._ensure_connection()
+            try:
+                cursor = self.conn.cursor()
+                cursor.execute('''
+                    CREATE TABLE levels_rebuilt (
+                        level_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        level_name TEXT NOT NULL,
+                        level_key TEXT,
+                        retired INTEGER NOT NULL DEFAULT 0
+                    )
+                ''')
+                cursor.execute('''
+                    INSERT INTO levels_rebuilt (level_id, level_name, level_key, retired)
+                    SELECT level_id, level_name, level_key, retired FROM levels
+                ''')
+                cursor.execute('DROP TABLE levels')
+                cursor.execute('ALTER TABLE levels_rebuilt RENAME TO levels')
+                self.conn.commit()
+                logging.info("Rebuilt levels table so retired level names can be reused")
+            except sqlite3.Error as e:
+                logging.error(f"Error rebuilding levels table: {e}")
+                self.conn.rollback()
+                raise DatabaseError(f"Failed to migrate levels table: {e}")
+
+    def _migrate_scores_verification(self) -> None:
+        """Add verification columns to score tables created before they existed"""
+        columns = {row[0] for row in self.execute("SELECT name FROM pragma_table_info('scores')")}
+        if 'verification_status' not in columns:
+            self.execute(
+                "ALTER TABLE scores ADD COLUMN verification_status TEXT NOT NULL DEFAULT 'unverified'"
+            )
+            logging.info("Added verification_status column to scores table")
+        if 'attachment_id' not in columns:
+            self.execute("ALTER TABLE scores ADD COLUMN attachment_id TEXT")
+        if 'attachment_hash' not in columns:
+            self.execute("ALTER TABLE scores ADD COLUMN attachment_hash TEXT")
+
+        # Pending rows written before the attachment URL was stored can never be verified
+        stale = self.execute("SELECT COUNT(*) FROM scores WHERE verification_status = 'pending'")[0][0]
+        if stale:
+            self.execute("UPDATE scores SET verification_status = 'unverified' WHERE verification_status = 'pending'")
+            logging.warning(f"Marked {stale} pending scores without a stored attachment as unverified")
+
     def backup(self) -> str:
         """Create a backup of the database"""
         try:
@@ -137,17 +393,22 @@ class Database:
             logging.error(f"Error getting scores for user {user_id}: {e}")
             return []
 
-    def get_level_leaderboard(self, level_id: int, difficulty: str) -> List[Tuple]:
-        """Get leaderboard for a specific level and difficulty"""
+    def get_level_leaderboard(self, level_id: int, difficulty: str,
+                              statuses: Optional[List[str]] = None) -> List[Tuple]:
+        """Get leaderboard for a specific level and difficulty, limited to the given verification statuses"""
+        if statuses is None:
+            statuses = [VerificationStatus.UNVERIFIED.value, VerificationStatus.VERIFIED.value]
         try:
             self._ensure_connection()
             cursor = self.conn.cursor()
-            cursor.execute('''
-                SELECT user_name, score 
-                FROM scores 
-                WHERE level_id = ? AND difficulty = ?
-                ORDER BY score DESC, user_name ASC
-            ''', (level_id, difficulty))
+            placeholders = ', '.join('?' for _ in statuses)
+            cursor.execute(f'''
+                SELECT n.user_name, s.score 
+                FROM scores s
+                JOIN user_names n ON s.user_id = n.user_id
+                WHERE s.level_id = ? AND s.difficulty = ? AND s.verification_status IN ({placeholders})
+                ORDER BY s.score DESC, n.user_name ASC
+            ''', (level_id, difficulty, *statuses))
             result = cursor.fetchall()
             # Debug logging
             logging.debug(f"Leaderboard query for level {level_id} ({difficulty}): Found {len(result) if result else 0} scores")
@@ -157,52 +418,394 @@ class Database:
             return []
 
     def insert_score(self, user_id: str, user_name: str, level_id: int, 
-                    difficulty: str, score: int) -> None:
+                    difficulty: str, score: int,
+                    verification_status: str = VerificationStatus.UNVERIFIED.value,
+                    attachment_id: Optional[str] = None,
+                    attachment_hash: Optional[str] = None,
+                    submitted_at: Optional[str] = None) -> None:
         """Insert or update a score"""
+        self.record_user_name(user_id, user_name)
+        self.execute('''
+            INSERT OR REPLACE INTO scores 
+                (user_id, user_name, level_id, difficulty, score, 
+                 verification_status, attachment_id, attachment_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (user_id, user_name, level_id, difficulty, score, 
+              verification_status, attachment_id, attachment_hash))
+        logging.info(f"Score inserted: {user_name} - Level ID: {level_id} ({difficulty}): {score} [{verification_status}]")
+        self._insert_season_scores(user_id, level_id, difficulty, score, verification_status,
+                                   attachment_id, submitted_at or _timestamp())
+
+    def _insert_season_scores(self, user_id: str, level_id: int, difficulty: str, score: int,
+                              verification_status: str, attachment_id: Optional[str],
+                              submitted_at: str) -> None:
+        """Record a score in every season whose window it was submitted in, keeping each player's best"""
+        # Only unverified or verified scores get here, so a higher score never replaces a
+        # season best before its proof has passed
+        self.execute('''
+            INSERT INTO season_scores 
+                (season_id, user_id, level_id, difficulty, score, 
+                 verification_status, attachment_id, submitted_at)
+            SELECT s.season_id, ?, sl.level_id, ?, ?, ?, ?, ?
+            FROM seasons s
+            JOIN season_levels sl ON s.season_id = sl.season_id
+            WHERE sl.level_id = ? AND s.closed = 0 AND s.starts_at <= ? AND s.ends_at > ?
+            ON CONFLICT (season_id, user_id, level_id, difficulty) DO UPDATE SET
+                score = excluded.score,
+                verification_status = excluded.verification_status,
+                attachment_id = excluded.attachment_id,
+                submitted_at = excluded.submitted_at
+            WHERE excluded.score > season_scores.score
+        ''', (user_id, difficulty, score, verification_status, attachment_id, submitted_at,
+              level_id, submitted_at, submitted_at))
+
+        # A proof verified after its season closed still counts if it was submitted before the close
+        self.execute('''
+            INSERT INTO season_results
+                (season_id, level_id, level_name, difficulty, user_id, user_name, score, verification_status)
+            SELECT s.season_id, rl.level_id, rl.level_name, ?, n.user_id, n.user_name, ?, ?
+            FROM seasons s
+            JOIN season_result_levels rl ON s.season_id = rl.season_id
+            JOIN user_names n ON n.user_id = ?
+            WHERE rl.level_id = ? AND s.closed = 1 AND s.starts_at <= ? AND s.ends_at > ?
+                AND s.closed_at > ?
+            ON CONFLICT (season_id, level_id, difficulty, user_id) DO UPDATE SET
+                score = excluded.score,
+                verification_status = excluded.verification_status
+            WHERE excluded.score > season_results.score
+        ''', (difficulty, score, verification_status, user_id,
+              level_id, submitted_at, submitted_at, submitted_at))
+
+    def record_user_name(self, user_id: str, user_name: str) -> None:
+        """Store a player's current name, touching the database only when it has changed"""
+        old_name = self.user_names.get(user_id)
+        if old_name == user_name:
+            return
         self.execute('''
-            INSERT OR REPLACE INTO scores (user_id, user_name, level_id, difficulty, score)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (user_id, user_name, level_id, difficulty, score))
-        logging.info(f"Score inserted: {user_name} - Level ID: {level_id} ({difficulty}): {score}")
+            INSERT INTO user_names (user_id, user_name, updated_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET 
+                user_name = excluded.user_name, 
+                updated_at = excluded.updated_at
+        ''', (user_id, user_name, _timestamp()))
+        self.user_names.set(user_id, user_name)
+        if old_name is not None:
+            logging.info(f"User {user_id} renamed: {old_name} -> {user_name}")
+
+    def insert_pending_score(self, user_id: str, user_name: str, level_id: int, difficulty: str,
+                             score: int, attachment_id: str, attachment_url: str,
+                             attachment_extension: str) -> None:
+        """Hold a score submitted with proof until the proof has been verified"""
+        self.record_user_name(user_id, user_name)
+        self.execute('''
+            INSERT INTO pending_scores 
+                (attachment_id, user_id, user_name, level_id, difficulty, score, 
+                 attachment_url, attachment_extension, submitted_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (attachment_id, user_id, user_name, level_id, difficulty, score,
+              attachment_url, attachment_extension, _timestamp()))
+        logging.info(f"Pending score inserted: {user_name} - Level ID: {level_id} ({difficulty}): {score}")
+
+    def get_pending_submissions(self) -> List[Tuple]:
+        """Get submissions still awaiting verification as (attachment_id, attachment_url, attachment_extension)"""
+        return self.execute('''
+            SELECT attachment_id, attachment_url, attachment_extension 
+            FROM pending_scores 
+            WHERE verification_status = 'pending'
+            ORDER BY submitted_at
+        ''')
+
+    def set_verification_result(self, attachment_id: str, status: str,
+                                attachment_hash: Optional[str] = None) -> None:
+        """Record the outcome of verifying a pending submission, promoting it to a score if it passed"""
+        self.execute('''
+            UPDATE pending_scores 
+            SET verification_status = ?, attachment_hash = ?
+            WHERE attachment_id = ?
+        ''', (status, attachment_hash, attachment_id))
+        logging.info(f"Verification result for attachment {attachment_id}: {status}")
+        if status != VerificationStatus.VERIFIED.value:
+            return
+
+        result = self.execute('''
+            SELECT user_id, user_name, level_id, difficulty, score, submitted_at 
+            FROM pending_scores 
+            WHERE attachment_id = ?
+        ''', (attachment_id,))
+        if result:
+            user_id, user_name, level_id, difficulty, score, submitted_at = result[0]
+            # Seasons count the score by when it was submitted, not when it was verified
+            self.insert_score(user_id, user_name, level_id, difficulty, score,
+                              status, attachment_id, attachment_hash, submitted_at)
+
+    def update_attachment_url(self, attachment_id: str, attachment_url: str) -> None:
+        """Store a refreshed URL for a pending submission whose signed URL expired"""
+        self.execute('UPDATE pending_scores SET attachment_url = ? WHERE attachment_id = ?',
+                     (attachment_url, attachment_id))
+
+    def claim_attachment_hash(self, attachment_id: str, attachment_hash: str) -> bool:
+        """Record a file hash on a pending submission unless another live submission already has it
+
+        The check and the write share one transaction, so two workers handling the same
+        file at once can't both pass. Rejected submissions don't hold on to their hash.
+        """
+        self._ensure_connection()
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('''
+                SELECT 1 FROM scores
+                WHERE attachment_hash = ? AND attachment_id != ?
+                UNION ALL
+                SELECT 1 FROM pending_scores
+                WHERE attachment_hash = ? AND attachment_id != ? AND verification_status != 'rejected'
+                LIMIT 1
+            ''', (attachment_hash, attachment_id, attachment_hash, attachment_id))
+            if cursor.fetchone():
+                self.conn.rollback()
+                return False
+            cursor.execute('UPDATE pending_scores SET attachment_hash = ? WHERE attachment_id = ?',
+                           (attachment_hash, attachment_id))
+            self.conn.commit()
+            return True
+        except sqlite3.Error as e:
+            logging.error(f"Error claiming hash for attachment {attachment_id}: {e}")
+            self.conn.rollback()
+            raise DatabaseError(f"Failed to record attachment hash: {e}")
+
+    def _data_version(self) -> Optional[int]:
+        """SQLite counter that changes whenever another connection commits, e.g. a CLI level sync"""
+        try:
+            self._ensure_connection()
+            return self.conn.execute('PRAGMA data_version').fetchone()[0]
+        except sqlite3.Error:
+            return None
 
     def get_levels(self) -> List[Tuple]:
-        """Get all levels"""
+        """Get all active levels, served from memory until the database is changed elsewhere"""
+        if self._levels is None or self._data_version() != self._levels_version:
+            self.refresh_levels()
+        return self._levels if self._levels is not None else []
+
+    def refresh_levels(self) -> None:
+        """Reload the in-memory level list"""
         try:
             self._ensure_connection()
+            self._levels_version = self._data_version()
             cursor = self.conn.cursor()
             cursor.execute('''
                 SELECT level_id, level_name 
                 FROM levels 
+                WHERE retired = 0
                 ORDER BY level_name
             ''')
             result = cursor.fetchall()
+            # Swap in the complete list at once so readers never see a partial update
+            self._levels = result if result is not None else []
             # Debug logging
-            logging.debug(f"Retrieved {len(result) if result else 0} levels")
-            return result if result is not None else []
+            logging.debug(f"Retrieved {len(self._levels)} levels")
         except Exception as e:
             logging.error(f"Error getting levels: {e}")
-            return []
 
     def add_level(self, level_name: str) -> bool:
         """Add a new level"""
         try:
             self.execute('INSERT INTO levels (level_name) VALUES (?)', (level_name,))
             logging.info(f"New level added: {level_name}")
+            self.refresh_levels()
             return True
-        except sqlite3.IntegrityError:
+        except DatabaseError:
             logging.warning(f"Level already exists: {level_name}")
             return False
 
-    def get_user_scores_by_name(self, user_name: str) -> List[Tuple]:
-        """Get all scores for a specific user by name"""
+    def get_level_catalog(self) -> List[Tuple]:
+        """Get every level, including retired ones, as (level_id, level_name, level_key, retired)"""
+        return self.execute('SELECT level_id, level_name, level_key, retired FROM levels ORDER BY level_id')
+
+    def apply_level_diff(self, diff) -> None:
+        """Apply a level catalog diff in one transaction and refresh the level cache"""
+        self._ensure_connection()
+        try:
+            cursor = self.conn.cursor()
+            # Retire first so the freed names can be reused by renames and additions
+            for level_id, _ in diff.retired:
+                cursor.execute('UPDATE levels SET retired = 1 WHERE level_id = ?', (level_id,))
+            # Rename through temporary names so levels can swap names without breaking uniqueness
+            for level_id, _, _ in diff.renamed:
+                cursor.execute('UPDATE levels SET level_name = ? WHERE level_id = ?',
+                               (f"__renaming_{level_id}", level_id))
+            for level_id, _, new_name in diff.renamed:
+                cursor.execute('UPDATE levels SET level_name = ? WHERE level_id = ?', (new_name, level_id))
+            for level_id, level_key in diff.keyed:
+                cursor.execute('UPDATE levels SET level_key = ? WHERE level_id = ?', (level_key, level_id))
+            for level_id, _ in diff.restored:
+                cursor.execute('UPDATE levels SET retired = 0 WHERE level_id = ?', (level_id,))
+            cursor.executemany(
+                'INSERT INTO levels (level_name, level_key) VALUES (?, ?)',
+                [(level.name, level.key) for level in diff.added]
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"Error applying level catalog changes: {e}")
+            self.conn.rollback()
+            raise DatabaseError(f"Failed to apply level catalog changes: {e}")
+
+        self.refresh_levels()
+        logging.info(
+            f"Level catalog synced: {len(diff.added)} added, {len(diff.renamed)} renamed, "
+            f"{len(diff.retired)} retired, {len(diff.restored)} restored"
+        )
+
+    def get_user_scores_by_id(self, user_id: str) -> List[Tuple]:
+        """Get all scores for a specific user as (level_id, difficulty, score)"""
         return self.execute('''
             SELECT s.level_id, s.difficulty, s.score 
             FROM scores s
-            WHERE s.user_name = ?
+            WHERE s.user_id = ?
             ORDER BY s.level_id, s.difficulty
-        ''', (user_name,))
+        ''', (user_id,))
+
+    def resolve_user_id(self, user: str) -> Optional[str]:
+        """Resolve an autocomplete value (user_id) or a typed name to a user_id"""
+        if self.user_names.get(user) is not None:
+            return user
+        return self.user_names.find_user_id(user)
+
+    def create_season(self, season_name: str, starts_at: datetime, ends_at: datetime) -> Optional[int]:
+        """Create a season for the given UTC time window, returning its ID or None if the name is taken"""
+        if self.get_season_by_name(season_name):
+            logging.warning(f"Season already exists: {season_name}")
+            return None
+        self.execute('''
+            INSERT INTO seasons (season_name, starts_at, ends_at)
+            VALUES (?, ?, ?)
+        ''', (season_name, _timestamp(starts_at), _timestamp(ends_at)))
+        logging.info(f"New season created: {season_name} ({starts_at} - {ends_at})")
+        return self.get_season_by_name(season_name)[0]
+
+    def add_season_level(self, season_id: int, level_id: int) -> bool:
+        """Add a level to a season"""
+        if self.execute('SELECT 1 FROM season_levels WHERE season_id = ? AND level_id = ?',
+                        (season_id, level_id)):
+            return False
+        self.execute('INSERT INTO season_levels (season_id, level_id) VALUES (?, ?)', (season_id, level_id))
+        logging.info(f"Level ID {level_id} added to season ID {season_id}")
+        return True
+
+    def get_seasons(self) -> List[Tuple]:
+        """Get all seasons as (season_id, season_name, starts_at, ends_at, closed), newest first"""
+        return self.execute('''
+            SELECT season_id, season_name, starts_at, ends_at, closed 
+            FROM seasons 
+            ORDER BY starts_at DESC
+        ''')
+
+    def get_season_by_name(self, season_name: str) -> Optional[Tuple]:
+        """Get a season as (season_id, season_name, starts_at, ends_at, closed)"""
+        result = self.execute('''
+            SELECT season_id, season_name, starts_at, ends_at, closed 
+            FROM seasons 
+            WHERE season_name = ?
+        ''', (season_name,))
+        return result[0] if result else None
+
+    def get_season_levels(self, season: Tuple) -> List[Tuple]:
+        """Get the levels of a season as (level_id, level_name), from the snapshot once it is closed"""
+        if season[4]:
+            return self.execute('''
+                SELECT level_id, level_name 
+                FROM season_result_levels 
+                WHERE season_id = ?
+                ORDER BY level_name
+            ''', (season[0],))
+        return self.execute('''
+            SELECT l.level_id, l.level_name 
+            FROM season_levels sl
+            JOIN levels l ON sl.level_id = l.level_id
+            WHERE sl.season_id = ?
+            ORDER BY l.level_name
+        ''', (season[0],))
+
+    def get_season_leaderboard(self, season: Tuple, level_id: int, difficulty: str,
+                               statuses: Optional[List[str]] = None) -> List[Tuple]:
+        """Get a season leaderboard, read from the frozen snapshot once the season is closed"""
+        if statuses is None:
+            statuses = [VerificationStatus.UNVERIFIED.value, VerificationStatus.VERIFIED.value]
+        placeholders = ', '.join('?' for _ in statuses)
+        season_id, closed = season[0], season[4]
+        if closed:
+            return self.execute(f'''
+                SELECT user_name, score 
+                FROM season_results 
+                WHERE season_id = ? AND level_id = ? AND difficulty = ? 
+                    AND verification_status IN ({placeholders})
+                ORDER BY score DESC, user_name ASC
+            ''', (season_id, level_id, difficulty, *statuses))
+        return self.execute(f'''
+            SELECT n.user_name, s.score 
+            FROM season_scores s
+            JOIN user_names n ON s.user_id = n.user_id
+            WHERE s.season_id = ? AND s.level_id = ? AND s.difficulty = ? 
+                AND s.verification_status IN ({placeholders})
+            ORDER BY s.score DESC, n.user_name ASC
+        ''', (season_id, level_id, difficulty, *statuses))
+
+    def get_user_season_scores(self, season: Tuple, user_id: str) -> List[Tuple]:
+        """Get a user's scores in a season as (level_id, level_name, difficulty, score)"""
+        if season[4]:
+            return self.execute('''
+                SELECT level_id, level_name, difficulty, score 
+                FROM season_results 
+                WHERE season_id = ? AND user_id = ?
+                ORDER BY level_name, difficulty
+            ''', (season[0], user_id))
+        return self.execute('''
+            SELECT s.level_id, l.level_name, s.difficulty, s.score 
+            FROM season_scores s
+            JOIN levels l ON s.level_id = l.level_id
+            WHERE s.season_id = ? AND s.user_id = ?
+            ORDER BY l.level_name, s.difficulty
+        ''', (season[0], user_id))
+
+    def close_season(self, season_id: int) -> None:
+        """Freeze a season's levels and results into snapshot tables and clear its live scores"""
+        self._ensure_connection()
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO season_result_levels (season_id, level_id, level_name)
+                SELECT sl.season_id, sl.level_id, l.level_name
+                FROM season_levels sl
+                JOIN levels l ON sl.level_id = l.level_id
+                WHERE sl.season_id = ?
+            ''', (season_id,))
+            cursor.execute('''
+                INSERT OR REPLACE INTO season_results 
+                    (season_id, level_id, level_name, difficulty, user_id, user_name, score, verification_status)
+                SELECT s.season_id, s.level_id, l.level_name, s.difficulty, s.user_id, n.user_name, 
+                       s.score, s.verification_status
+                FROM season_scores s
+                JOIN levels l ON s.level_id = l.level_id
+                JOIN user_names n ON s.user_id = n.user_id
+                WHERE s.season_id = ?
+            ''', (season_id,))
+            cursor.execute('DELETE FROM season_scores WHERE season_id = ?', (season_id,))
+            cursor.execute('UPDATE seasons SET closed = 1, closed_at = ? WHERE season_id = ?',
+                           (_timestamp(), season_id))
+            self.conn.commit()
+            logging.info(f"Season ID {season_id} closed and results frozen")
+        except sqlite3.Error as e:
+            logging.error(f"Error closing season {season_id}: {e}")
+            self.conn.rollback()
+            raise DatabaseError(f"Failed to close season: {e}")
 
-    def get_unique_users(self) -> List[str]:
-        """Get list of all unique usernames"""
-        result = self.execute('SELECT DISTINCT user_name FROM scores ORDER BY user_name')
-        return [row[0] for row in result] if result else []
+    def close_expired_seasons(self) -> List[str]:
+        """Close every open season whose time window has ended, returning their names"""
+        expired = self.execute('''
+            SELECT season_id, season_name 
+            FROM seasons 
+            WHERE closed = 0 AND ends_at <= ?
+        ''', (_timestamp(),))
+        for season_id, _ in expired:
+            self.close_season(season_id)
+        return [season_name for _, season_name in expired]
@@ -1,38 +1,30 @@
-import csv
 import os
 import logging
+from typing import Optional
 from database import Database
 from config import Config
+from level_catalog import load_source, sync_levels
 
-def init_beat_saber_levels(csv_file: str) -> None:
+def init_beat_saber_levels(csv_file: str, db: Optional[Database] = None) -> None:
     """Initialize the database with levels from CSV file, preserving existing levels"""
-    db = Database()
+    db = db or Database()
     
     try:
         # Initialize database tables if they don't exist
         db.init_db()
         
-        # Get existing levels
-        with Database() as db:
-            existing_levels = db.execute("SELECT level_name FROM levels")
-            existing_level_names = {level[0] for level in existing_levels} if existing_levels else set()
-        
-        # Read and insert only new levels
-        with open(csv_file, 'r', encoding='utf-8') as file:
-            csv_reader = csv.reader(file)
-            levels_added = 0
-            for row in csv_reader:
-                level_name = row[0].strip()
-                if level_name and level_name not in existing_level_names:
-                    if db.add_level(level_name):
-                        levels_added += 1
-                        existing_level_names.add(level_name)
+        # Add new levels without retiring any that are missing from the file, and fix up
+        # names that older versions of this script cut off at the first comma
+        diff = sync_levels(db, load_source(csv_file), retire_missing=False, legacy_names=True)
+        levels_added = len(diff.added)
                     
         if levels_added > 0:
             logging.info(f"Added {levels_added} new levels from {csv_file}")
             print(f"Added {levels_added} new levels from {csv_file}")
         else:
             print("No new levels to add.")
+        if diff.renamed:
+            print(f"Renamed {len(diff.renamed)} levels to match {csv_file}")
         
     except Exception as e:
         error_msg = f"Error initializing Beat Saber levels: {e}"
@@ -0,0 +1,279 @@
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from config import Config
+from constants import CatalogLimits
+from database import Database
+
+KEY_FIELDS = ('level_key', 'hash', 'id', 'key')
+NAME_FIELDS = ('level_name', 'name', 'songName')
+
+class CatalogError(Exception):
+    """Custom exception for unreadable level catalog sources"""
+    pass
+
+class RetireLimitError(CatalogError):
+    """Raised when a sync would retire more levels than allowed without force"""
+    pass
+
+class LevelConflictError(CatalogError):
+    """Raised when a sync would leave two active levels with the same name"""
+    pass
+
+@dataclass(frozen=True)
+class SourceLevel:
+    name: str
+    key: Optional[str] = None  # Stable ID such as a map hash, if the source has one
+
+@dataclass
+class CatalogDiff:
+    added: List[SourceLevel] = field(default_factory=list)
+    renamed: List[Tuple[int, str, str]] = field(default_factory=list)  # (level_id, old name, new name)
+    keyed: List[Tuple[int, str]] = field(default_factory=list)  # (level_id, stable key now known)
+    retired: List[Tuple[int, str]] = field(default_factory=list)
+    restored: List[Tuple[int, str]] = field(default_factory=list)
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.renamed or self.keyed or self.retired or self.restored)
+
+    def summary(self) -> str:
+        if self.is_empty():
+            return "Level catalog is already up to date."
+        lines = [
+            f"Added: {len(self.added)}, renamed: {len(self.renamed)}, retired: {len(self.retired)}, "
+            f"restored: {len(self.restored)}, keys assigned: {len(self.keyed)}"
+        ]
+        lines += [f"+ {level.name}" for level in self.added]
+        lines += [f"~ {old} -> {new}" for _, old, new in self.renamed]
+        lines += [f"- {name}" for _, name in self.retired]
+        lines += [f"^ {name}" for _, name in self.restored]
+        return "\n".join(lines)
+
+def _first_field(entry: dict, fields: Tuple[str, ...]) -> Optional[str]:
+    for name in fields:
+        value = entry.get(name)
+        # Only plain strings and numbers count, bool is excluded because it is an int subclass
+        if isinstance(value, (str, int, float)) and not isinstance(value, bool) and str(value).strip():
+            return str(value).strip()
+    return None
+
+def parse_source(text: str, source_format: str) -> List[SourceLevel]:
+    """Parse a level list from a CSV or JSON dump
+
+    CSV files either have a `level_key,level_name` header, or contain one full level
+    name per line as in beat_saber_levels.csv. JSON dumps are a list of names or of
+    objects with a key field (level_key, hash, id or key) and a name field
+    (level_name, name or songName), optionally wrapped in a "levels" or "maps" object.
+    """
+    levels = []
+    if source_format == 'json':
+        try:
+            data = json.loads(text)
+        except ValueError as e:
+            raise CatalogError(f"Invalid JSON: {e}")
+        if isinstance(data, dict):
+            if 'levels' not in data and 'maps' not in data:
+                raise CatalogError("JSON object must contain a 'levels' or 'maps' list")
+            data = data.get('levels', data.get('maps'))
+        if not isinstance(data, list):
+            raise CatalogError("JSON level list must be an array")
+        for entry in data:
+            if isinstance(entry, str):
+                if entry.strip():
+                    levels.append(SourceLevel(entry.strip()))
+                continue
+            if not isinstance(entry, dict):
+                raise CatalogError(f"Level entries must be names or objects, got: {entry!r}")
+            metadata = entry.get('metadata') or {}
+            if not isinstance(metadata, dict):
+                raise CatalogError(f"Level metadata must be an object: {entry!r}")
+            name = _first_field(entry, NAME_FIELDS) or _first_field(metadata, NAME_FIELDS)
+            if not name:
+                raise CatalogError(f"Level entry without a name: {entry!r}")
+            levels.append(SourceLevel(name, _first_field(entry, KEY_FIELDS)))
+    elif source_format == 'csv':
+        lines = text.splitlines()
+        header = [column.strip().lower() for column in next(csv.reader(lines[:1]), [])]
+        if header == ['level_key', 'level_name']:
+            for row in csv.reader(io.StringIO("\n".join(lines[1:]))):
+                if len(row) >= 2 and row[1].strip():
+                    levels.append(SourceLevel(row[1].strip(), row[0].strip() or None))
+        else:
+            # Unquoted names may contain commas, so each line is one full name
+            levels = [SourceLevel(line.strip()) for line in lines if line.strip()]
+    else:
+        raise CatalogError(f"Unsupported source format: {source_format}")
+
+    # Drop duplicates, keeping the first occurrence
+    seen = set()
+    names = {}
+    unique = []
+    for level in levels:
+        identity = level.key or level.name
+        if identity in seen:
+            continue
+        # Active level names must be unique, so two different maps can't share one
+        if level.name in names:
+            raise CatalogError(f"Level name '{level.name}' is used by more than one entry")
+        seen.add(identity)
+        names[level.name] = level
+        unique.append(level)
+
+    # An empty list would retire the whole catalog
+    if not unique:
+        raise CatalogError("The level list is empty")
+    return unique
+
+def load_source(path: str) -> List[SourceLevel]:
+    """Read a level list from a .csv or .json file"""
+    source_format = os.path.splitext(path)[1].lower().lstrip('.')
+    with open(path, 'r', encoding='utf-8') as file:
+        return parse_source(file.read(), source_format)
+
+def compute_diff(db_levels: List[Tuple], source: List[SourceLevel], retire_missing: bool = True,
+                 legacy_names: bool = False) -> CatalogDiff:
+    """Compare the levels table, as (level_id, level_name, level_key, retired) rows, with a source list
+
+    With legacy_names, unkeyed levels whose stored name is the part of a source name before
+    its first comma are treated as renames. Older imports cut names off there.
+    """
+    diff = CatalogDiff()
+    by_key = {row[2]: row for row in db_levels if row[2]}
+    # Retired levels may share a name with an active one, so active levels take precedence
+    by_name = {row[1]: row for row in sorted(db_levels, key=lambda row: not row[3])}
+    matched: Dict[SourceLevel, Tuple] = {}
+    claimed = set()
+
+    def claim(level: SourceLevel, row: Optional[Tuple]) -> bool:
+        if row is None or row[0] in claimed:
+            return False
+        # A level that already has a stable key only matches that key
+        if level.key and row[2] and row[2] != level.key:
+            return False
+        matched[level] = row
+        claimed.add(row[0])
+        return True
+
+    # Match by stable key, then by exact name
+    for level in source:
+        if level.key:
+            claim(level, by_key.get(level.key))
+    for level in source:
+        if level not in matched:
+            claim(level, by_name.get(level.name))
+
+    # Older imports stored names cut off at the first comma. A keyed entry is a different
+    # map from any level it doesn't share a key with, so only plain names are matched this way
+    if legacy_names:
+        for level in source:
+            if level not in matched and not level.key and ',' in level.name:
+                row = by_name.get(level.name.split(',')[0].strip())
+                if row is not None and not row[2]:
+                    claim(level, row)
+
+    for level in source:
+        row = matched.get(level)
+        if row is None:
+            diff.added.append(level)
+            continue
+        level_id, level_name, level_key, retired = row
+        if level_name != level.name:
+            diff.renamed.append((level_id, level_name, level.name))
+        if level.key and not level_key:
+            diff.keyed.append((level_id, level.key))
+        if retired:
+            diff.restored.append((level_id, level.name))
+
+    if retire_missing:
+        diff.retired = [
+            (level_id, level_name)
+            for level_id, level_name, _, retired in db_levels
+            if level_id not in claimed and not retired
+        ]
+    _check_name_conflicts(db_levels, matched, diff)
+    return diff
+
+def _check_name_conflicts(db_levels: List[Tuple], matched: Dict[SourceLevel, Tuple], diff: CatalogDiff) -> None:
+    """Make sure the synced catalog has no two active levels with the same name"""
+    retired_ids = {level_id for level_id, _ in diff.retired}
+    matched_ids = {row[0] for row in matched.values()}
+    active: Dict[str, List[str]] = {}
+    for level, (level_id, level_name, _, _) in matched.items():
+        active.setdefault(level.name, []).append(f"level {level_id} ('{level_name}')")
+    for level_id, level_name, _, retired in db_levels:
+        # Levels the sync doesn't touch keep their name and status
+        if level_id not in matched_ids and level_id not in retired_ids and not retired:
+            active.setdefault(level_name, []).append(f"level {level_id} ('{level_name}')")
+    for level in diff.added:
+        active.setdefault(level.name, []).append("a new level")
+
+    conflicts = [f"'{name}' would be used by {' and '.join(levels)}"
+                 for name, levels in active.items() if len(levels) > 1]
+    if conflicts:
+        raise LevelConflictError(
+            f"Two active levels can't share a name: {'; '.join(conflicts)}. "
+            f"Rename or retire one of them first."
+        )
+
+def check_retire_limit(db_levels: List[Tuple], diff: CatalogDiff) -> None:
+    """Refuse diffs that would retire a large part of the active catalog"""
+    active = sum(1 for row in db_levels if not row[3])
+    if diff.retired and len(diff.retired) > active * CatalogLimits.MAX_RETIRED_FRACTION:
+        raise RetireLimitError(
+            f"This sync would retire {len(diff.retired)} of {active} active levels. "
+            f"Check the level list, or force the sync if this is intended."
+        )
+
+def sync_levels(db: Database, source: List[SourceLevel], retire_missing: bool = True,
+                dry_run: bool = False, force: bool = False, legacy_names: bool = False) -> CatalogDiff:
+    """Bring the levels table in line with a source list in a single transaction"""
+    if not source:
+        raise CatalogError("The level list is empty")
+    db_levels = db.get_level_catalog()
+    diff = compute_diff(db_levels, source, retire_missing, legacy_names)
+    if not dry_run and not force:
+        check_retire_limit(db_levels, diff)
+    if not dry_run and not diff.is_empty():
+        db.apply_level_diff(diff)
+    return diff
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync the levels table with a CSV or JSON level list")
+    parser.add_argument('source', nargs='?', default=Config.LEVEL_CATALOG_FILE,
+                        help="CSV or JSON file with the level list")
+    parser.add_argument('--dry-run', action='store_true', help="Show the changes without applying them")
+    parser.add_argument('--keep-missing', action='store_true',
+                        help="Don't retire levels that are missing from the source")
+    parser.add_argument('--force', action='store_true',
+                        help="Allow retiring more than the usual share of the catalog")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        filename=Config.LOG_FILE,
+        level=getattr(logging, Config.LOG_LEVEL),
+        format='%(asctime)s:%(levelname)s:%(message)s'
+    )
+
+    if not os.path.exists(args.source):
+        print(f"Error: {args.source} not found!")
+        exit(1)
+
+    db = Database()
+    try:
+        db.init_db()
+        diff = sync_levels(db, load_source(args.source), not args.keep_missing, args.dry_run, args.force)
+        print(diff.summary())
+        if args.dry_run:
+            print("Dry run, no changes applied.")
+    except Exception as e:
+        error_msg = f"Error syncing levels: {e}"
+        logging.error(error_msg)
+        print(error_msg)
+        exit(1)
+    finally:
+        db.close()
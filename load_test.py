@@ -0,0 +1,246 @@
+import argparse
+import asyncio
+import logging
+import os
+import random
+import tempfile
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+from config import Config
+from constants import Difficulty, ScoreLimits
+from database import Database
+from level_catalog import load_source, sync_levels
+from cogs.scores import ScoresCog
+
+DISCORD_DEADLINE = 3.0  # Seconds Discord allows before an interaction fails
+LOAD_TEST_CHANNEL_ID = 1
+COMMANDS = ('score', 'level_autocomplete', 'leaderboard', 'user_name_autocomplete')
+
+class FakeResponse:
+    """Stands in for discord.InteractionResponse, recording when the first response is sent"""
+
+    def __init__(self, interaction: 'FakeInteraction'):
+        self.interaction = interaction
+
+    def is_done(self) -> bool:
+        return self.interaction.responded_at is not None
+
+    async def send_message(self, *args, **kwargs) -> None:
+        self.interaction.mark_responded()
+
+    async def defer(self, *args, **kwargs) -> None:
+        self.interaction.mark_responded()
+
+class FakeFollowup:
+    async def send(self, *args, **kwargs) -> None:
+        pass
+
+class FakeInteraction:
+    """Minimal discord.Interaction with the attributes ScoresCog uses"""
+
+    def __init__(self, user_id: int, user_name: str, administrator: bool = False):
+        self.user = SimpleNamespace(
+            id=user_id,
+            name=user_name,
+            guild_permissions=SimpleNamespace(administrator=administrator)
+        )
+        self.channel_id = LOAD_TEST_CHANNEL_ID
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup()
+        self.responded_at: Optional[float] = None
+
+    def mark_responded(self) -> None:
+        if self.responded_at is None:
+            self.responded_at = time.perf_counter()
+
+@dataclass
+class StepResult:
+    concurrency: int
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: {name: [] for name in COMMANDS})
+    loop_lag: List[float] = field(default_factory=list)
+    errors: int = 0
+
+    def all_latencies(self) -> List[float]:
+        return [latency for values in self.latencies.values() for latency in values]
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+class LoadTest:
+    """Drives ScoresCog handlers with fake interactions over a single asyncio loop"""
+
+    def __init__(self, db: Database, players: int, mix: Dict[str, int],
+                 rate: float, duration: float, deadline: float):
+        self.db = db
+        self.cog = ScoresCog(SimpleNamespace(db=db, verifier=None))
+        self.levels = [level[1] for level in db.get_levels()]
+        self.players = players
+        self.commands = list(mix)
+        self.weights = [mix[name] for name in self.commands]
+        self.rate = rate
+        self.duration = duration
+        self.deadline = deadline
+
+    async def _call(self, command: str) -> FakeInteraction:
+        player = random.randrange(self.players)
+        interaction = FakeInteraction(player, f"player{player}", administrator=True)
+        level = random.choice(self.levels)
+        difficulty = random.choice(Difficulty.list())
+        if command == 'score':
+            score = random.randint(ScoreLimits.MIN, ScoreLimits.MAX)
+            await self.cog.score.callback(self.cog, interaction, level, difficulty, score)
+        elif command == 'leaderboard':
+            await self.cog.leaderboard.callback(self.cog, interaction, level, difficulty)
+        elif command == 'level_autocomplete':
+            await self.cog.level_autocomplete(interaction, level[:random.randint(1, 4)])
+            interaction.mark_responded()
+        elif command == 'user_name_autocomplete':
+            await self.cog.user_name_autocomplete(interaction, f"player{random.randrange(100)}")
+            interaction.mark_responded()
+        return interaction
+
+    async def _worker(self, result: StepResult, interval: float, stop_at: float) -> None:
+        # Requests are scheduled on a fixed timetable and latency is measured from the
+        # scheduled time, so a stalled loop shows up as queueing delay instead of being hidden
+        scheduled = time.perf_counter() + random.uniform(0, interval)
+        while scheduled < stop_at:
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            command = random.choices(self.commands, self.weights)[0]
+            try:
+                interaction = await self._call(command)
+            except Exception as e:
+                logging.error(f"Load test {command} failed: {e}")
+                result.errors += 1
+            else:
+                if interaction.responded_at is None:
+                    result.errors += 1
+                else:
+                    result.latencies[command].append(interaction.responded_at - scheduled)
+            scheduled += interval
+
+    async def _monitor_loop_lag(self, result: StepResult, stop_at: float, interval: float = 0.01) -> None:
+        while time.perf_counter() < stop_at:
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            result.loop_lag.append(max(0.0, time.perf_counter() - expected))
+
+    async def run_step(self, concurrency: int) -> StepResult:
+        """Run concurrency simulated users, each sending requests at the configured rate"""
+        result = StepResult(concurrency)
+        interval = 1 / self.rate
+        stop_at = time.perf_counter() + self.duration
+        await asyncio.gather(
+            self._monitor_loop_lag(result, stop_at),
+            *(self._worker(result, interval, stop_at) for _ in range(concurrency))
+        )
+        return result
+
+    def is_saturated(self, result: StepResult) -> bool:
+        latencies = result.all_latencies()
+        return bool(result.errors) or percentile(latencies, 99) > self.deadline
+
+def seed_database(db: Database, level_file: str, players: int, scores_per_player: int) -> None:
+    """Fill a scratch database with levels and existing scores"""
+    db.init_db()
+    # Load levels the same way the bot does, so the scratch catalog matches the real one
+    sync_levels(db, load_source(level_file))
+    level_ids = [level[0] for level in db.get_levels()]
+    rows = {}
+    for player in range(players):
+        for _ in range(scores_per_player):
+            level_id, difficulty = random.choice(level_ids), random.choice(Difficulty.list())
+            score = random.randint(ScoreLimits.MIN, ScoreLimits.MAX)
+            rows[(player, level_id, difficulty)] = (str(player), f"player{player}", level_id, difficulty, score)
+    db.conn.executemany(
+        'INSERT INTO scores (user_id, user_name, level_id, difficulty, score) VALUES (?, ?, ?, ?, ?)',
+        rows.values()
+    )
+    db.conn.commit()
+    # Running init again backfills user_names and loads the name cache
+    db.init_db()
+
+def print_report(results: List[StepResult], load_test: LoadTest) -> None:
+    print(f"{'conc':>5} {'command':<24} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'missed':>7}")
+    for result in results:
+        for command in COMMANDS:
+            latencies = result.latencies[command]
+            if not latencies:
+                continue
+            missed = sum(1 for latency in latencies if latency > load_test.deadline)
+            print(f"{result.concurrency:>5} {command:<24} {len(latencies):>6} "
+                  f"{percentile(latencies, 50) * 1000:>9.1f} {percentile(latencies, 95) * 1000:>9.1f} "
+                  f"{percentile(latencies, 99) * 1000:>9.1f} {max(latencies) * 1000:>9.1f} {missed:>7}")
+        print(f"{result.concurrency:>5} {'event loop lag':<24} {len(result.loop_lag):>6} "
+              f"{percentile(result.loop_lag, 50) * 1000:>9.1f} {percentile(result.loop_lag, 95) * 1000:>9.1f} "
+              f"{percentile(result.loop_lag, 99) * 1000:>9.1f} {max(result.loop_lag, default=0) * 1000:>9.1f} "
+              f"{result.errors:>7}")
+
+    saturated = next((r for r in results if load_test.is_saturated(r)), None)
+    if saturated:
+        print(f"\nSaturation point: {saturated.concurrency} concurrent users at {load_test.rate:g} req/s each "
+              f"(p99 time-to-first-response over {load_test.deadline:g}s or failed interactions)")
+    else:
+        print(f"\nNo saturation up to {results[-1].concurrency} concurrent users at {load_test.rate:g} req/s each")
+
+def parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in COMMANDS:
+            raise argparse.ArgumentTypeError(f"Unknown command '{name}', choose from: {', '.join(COMMANDS)}")
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+async def run_load_test(args: argparse.Namespace) -> None:
+    # The harness uses a fake channel, so it has to be allowed for the duration of the run
+    Config.ALLOWED_CHANNEL_IDS.append(LOAD_TEST_CHANNEL_ID)
+    with tempfile.TemporaryDirectory() as folder:
+        db = Database(os.path.join(folder, 'load_test.db'))
+        try:
+            seed_database(db, args.levels, args.players, args.scores_per_player)
+            load_test = LoadTest(db, args.players, args.mix, args.rate, args.duration, args.deadline)
+            results = []
+            for concurrency in args.concurrency:
+                print(f"Running {concurrency} concurrent users for {args.duration:g}s...")
+                result = await load_test.run_step(concurrency)
+                results.append(result)
+                if load_test.is_saturated(result) and not args.keep_going:
+                    break
+            print()
+            print_report(results, load_test)
+        finally:
+            db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Simulate concurrent Discord interactions against ScoresCog (runs offline)"
+    )
+    parser.add_argument('--concurrency', type=lambda v: [int(c) for c in v.split(',')],
+                        default=[1, 10, 50, 100, 250, 500, 1000],
+                        help="Comma-separated concurrent user counts to step through")
+    parser.add_argument('--rate', type=float, default=1.0,
+                        help="Requests per second sent by each simulated user")
+    parser.add_argument('--duration', type=float, default=10.0,
+                        help="Seconds to run each concurrency step")
+    parser.add_argument('--mix', type=parse_mix,
+                        default=parse_mix('score=2,level_autocomplete=6,leaderboard=1,user_name_autocomplete=1'),
+                        help="Weighted command mix, e.g. score=2,level_autocomplete=6")
+    parser.add_argument('--players', type=int, default=500, help="Number of seeded players")
+    parser.add_argument('--scores-per-player', type=int, default=20, help="Seeded scores per player")
+    parser.add_argument('--levels', default=Config.LEVEL_CATALOG_FILE, help="CSV or JSON file with the level list")
+    parser.add_argument('--deadline', type=float, default=DISCORD_DEADLINE,
+                        help="Response deadline in seconds used to detect saturation")
+    parser.add_argument('--keep-going', action='store_true',
+                        help="Keep running steps after saturation is reached")
+    args = parser.parse_args()
+
+    # Only warnings and errors, so per-command log output doesn't skew the timings
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s:%(levelname)s:%(message)s')
+    asyncio.run(run_load_test(args))
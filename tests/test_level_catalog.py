@@ -0,0 +1,203 @@
+import pytest
+from database import Database
+from level_catalog import (
+    CatalogError,
+    LevelConflictError,
+    RetireLimitError,
+    SourceLevel,
+    compute_diff,
+    parse_source,
+    sync_levels
+)
+
+def level_row(level_id, name, key=None, retired=0):
+    return (level_id, name, key, retired)
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(str(tmp_path / 'levels.db'))
+    database.init_db()
+    yield database
+    database.close()
+
+def test_unchanged_catalog_gives_empty_diff():
+    diff = compute_diff([level_row(1, 'Song')], [SourceLevel('Song')])
+    assert diff.is_empty()
+
+def test_missing_levels_are_retired_and_new_ones_added():
+    diff = compute_diff([level_row(1, 'Old'), level_row(2, 'Kept')],
+                        [SourceLevel('Kept'), SourceLevel('New')])
+    assert diff.retired == [(1, 'Old')]
+    assert diff.added == [SourceLevel('New')]
+    assert not diff.renamed
+
+def test_keep_missing_does_not_retire():
+    diff = compute_diff([level_row(1, 'Old')], [SourceLevel('New')], retire_missing=False)
+    assert not diff.retired
+
+def test_rename_by_key():
+    diff = compute_diff([level_row(1, 'Old Name', 'k1')], [SourceLevel('New Name', 'k1')])
+    assert diff.renamed == [(1, 'Old Name', 'New Name')]
+    assert not diff.added and not diff.retired
+
+def test_name_swap_by_key():
+    diff = compute_diff([level_row(1, 'A', 'k1'), level_row(2, 'B', 'k2')],
+                        [SourceLevel('B', 'k1'), SourceLevel('A', 'k2')])
+    assert sorted(diff.renamed) == [(1, 'A', 'B'), (2, 'B', 'A')]
+    assert not diff.added and not diff.retired
+
+def test_unkeyed_level_is_matched_by_name_and_gets_key():
+    diff = compute_diff([level_row(1, 'Song')], [SourceLevel('Song', 'k1')])
+    assert diff.keyed == [(1, 'k1')]
+    assert not diff.added
+
+def test_level_with_other_key_is_not_matched_by_name():
+    diff = compute_diff([level_row(1, 'Song', 'k1', retired=1)], [SourceLevel('Song', 'k3')])
+    assert diff.added == [SourceLevel('Song', 'k3')]
+    assert not diff.restored
+
+def test_retired_level_is_restored():
+    diff = compute_diff([level_row(1, 'Song', 'k1', retired=1)], [SourceLevel('Song again', 'k1')])
+    assert diff.restored == [(1, 'Song again')]
+    assert diff.renamed == [(1, 'Song', 'Song again')]
+
+def test_active_level_preferred_over_retired_namesake():
+    diff = compute_diff([level_row(1, 'Song', retired=1), level_row(2, 'Song')], [SourceLevel('Song')])
+    assert diff.is_empty()
+
+def test_comma_truncated_name_is_renamed_for_legacy_names():
+    diff = compute_diff([level_row(1, 'Hey Look Ma')], [SourceLevel('Hey Look Ma, I Made It')],
+                        legacy_names=True)
+    assert diff.renamed == [(1, 'Hey Look Ma', 'Hey Look Ma, I Made It')]
+    assert not diff.added and not diff.retired
+
+def test_comma_heuristic_is_off_by_default():
+    diff = compute_diff([level_row(1, 'Crab Rave')], [SourceLevel('Crab Rave, Remix')], retire_missing=False)
+    assert not diff.renamed
+    assert diff.added == [SourceLevel('Crab Rave, Remix')]
+
+def test_comma_heuristic_skips_keyed_entries():
+    diff = compute_diff([level_row(1, 'Crab Rave')], [SourceLevel('Crab Rave, Remix', 'abc123')],
+                        retire_missing=False, legacy_names=True)
+    assert not diff.renamed and not diff.keyed
+    assert diff.added == [SourceLevel('Crab Rave, Remix', 'abc123')]
+
+def test_exact_name_wins_over_comma_heuristic():
+    diff = compute_diff([level_row(1, 'Dance')], [SourceLevel('Dance, Dance'), SourceLevel('Dance')],
+                        legacy_names=True)
+    assert not diff.renamed
+    assert diff.added == [SourceLevel('Dance, Dance')]
+
+def test_restore_onto_active_name_is_a_conflict():
+    db_levels = [level_row(1, 'Song', 'k1', retired=1), level_row(2, 'Song')]
+    with pytest.raises(LevelConflictError, match="level 1.*level 2"):
+        compute_diff(db_levels, [SourceLevel('Song', 'k1')], retire_missing=False)
+    # Retiring the unmatched namesake frees the name
+    diff = compute_diff(db_levels, [SourceLevel('Song', 'k1')])
+    assert diff.restored == [(1, 'Song')]
+    assert diff.retired == [(2, 'Song')]
+
+def test_rename_onto_kept_name_is_a_conflict():
+    with pytest.raises(LevelConflictError):
+        compute_diff([level_row(1, 'Old', 'k1'), level_row(2, 'Taken')], [SourceLevel('Taken', 'k1')],
+                     retire_missing=False)
+
+def test_csv_lines_keep_commas():
+    levels = parse_source("Beat Saber\nHey Look Ma, I Made It\n\n", 'csv')
+    assert levels == [SourceLevel('Beat Saber'), SourceLevel('Hey Look Ma, I Made It')]
+
+def test_keyed_csv():
+    levels = parse_source('level_key,level_name\nk1,"Dance, Dance"\n', 'csv')
+    assert levels == [SourceLevel('Dance, Dance', 'k1')]
+
+def test_json_map_dump():
+    levels = parse_source('{"maps": [{"hash": "k1", "metadata": {"songName": "Song"}}]}', 'json')
+    assert levels == [SourceLevel('Song', 'k1')]
+
+@pytest.mark.parametrize('text, source_format', [
+    ('', 'csv'),
+    ('level_key,level_name\n', 'csv'),
+    ('[]', 'json'),
+    ('{"songs": [{"name": "Song"}]}', 'json'),
+    ('42', 'json'),
+    ('"Song"', 'json'),
+    ('{"levels": {"name": "Song"}}', 'json'),
+    ('[42]', 'json'),
+    ('[{"hash": "k1", "metadata": null}]', 'json'),
+    ('[{"name": "Song", "metadata": "x"}]', 'json'),
+    ('[{"name": {"nested": true}}]', 'json'),
+    ('[{"name": "Song", "hash": "k1"}, {"name": "Song", "hash": "k2"}]', 'json'),
+    ('not json', 'json'),
+    ('Song', 'txt'),
+])
+def test_bad_sources_raise_catalog_error(text, source_format):
+    with pytest.raises(CatalogError):
+        parse_source(text, source_format)
+
+def test_sync_refuses_to_retire_most_of_the_catalog(db):
+    sync_levels(db, [SourceLevel(f"Song {i}") for i in range(10)])
+    with pytest.raises(RetireLimitError):
+        sync_levels(db, [SourceLevel('Song 0')])
+    assert len(db.get_levels()) == 10
+
+    sync_levels(db, [SourceLevel('Song 0')], force=True)
+    assert db.get_levels() == [(1, 'Song 0')]
+
+def test_sync_applies_swap_and_refreshes_cache(db):
+    sync_levels(db, [SourceLevel('A', 'k1'), SourceLevel('B', 'k2')])
+    sync_levels(db, [SourceLevel('B', 'k1'), SourceLevel('A', 'k2')])
+    assert sorted(db.get_levels()) == [(1, 'B'), (2, 'A')]
+
+def test_sync_renames_onto_name_of_retired_level(db):
+    sync_levels(db, [SourceLevel('Song', 'k1'), SourceLevel('Other', 'k2')])
+    sync_levels(db, [SourceLevel('Song', 'k2')], force=True)
+    assert db.get_levels() == [(2, 'Song')]
+
+def test_sync_adds_level_named_like_retired_level(db):
+    sync_levels(db, [SourceLevel('Song', 'k1'), SourceLevel('Other', 'k2')])
+    sync_levels(db, [SourceLevel('Other', 'k2')], force=True)
+    sync_levels(db, [SourceLevel('Other', 'k2'), SourceLevel('Song', 'k3')])
+    assert [name for _, name in db.get_levels()] == ['Other', 'Song']
+    assert len(db.get_level_catalog()) == 3
+
+def test_keep_missing_conflict_leaves_catalog_unchanged(db):
+    sync_levels(db, [SourceLevel('Song', 'k1'), SourceLevel('Other', 'k2')])
+    sync_levels(db, [SourceLevel('Other', 'k2')], force=True)
+    db.add_level('Song')
+    with pytest.raises(LevelConflictError):
+        sync_levels(db, [SourceLevel('Song', 'k1')], retire_missing=False)
+    assert [name for _, name in db.get_levels()] == ['Other', 'Song']
+
+def test_dry_run_changes_nothing(db):
+    sync_levels(db, [SourceLevel('A')])
+    diff = sync_levels(db, [SourceLevel('B')], dry_run=True)
+    assert diff.retired == [(1, 'A')]
+    assert db.get_levels() == [(1, 'A')]
+
+def test_level_cache_sees_changes_from_other_connections(db):
+    sync_levels(db, [SourceLevel('A', 'k1')])
+    assert db.get_levels() == [(1, 'A')]
+
+    other = Database(db.db_name)
+    try:
+        other.init_db()
+        sync_levels(other, [SourceLevel('Renamed', 'k1')])
+    finally:
+        other.close()
+    assert db.get_levels() == [(1, 'Renamed')]
+
+def test_old_unique_level_names_are_migrated(tmp_path):
+    path = str(tmp_path / 'old.db')
+    old = Database(path)
+    old.execute('CREATE TABLE levels (level_id INTEGER PRIMARY KEY AUTOINCREMENT, level_name TEXT UNIQUE NOT NULL)')
+    old.execute("INSERT INTO levels (level_name) VALUES ('Song')")
+    old.close()
+
+    db = Database(path)
+    try:
+        db.init_db()
+        sync_levels(db, [SourceLevel('Other', 'k2')], force=True)
+        sync_levels(db, [SourceLevel('Other', 'k2'), SourceLevel('Song', 'k3')])
+        assert [name for _, name in db.get_levels()] == ['Other', 'Song']
+    finally:
+        db.close()
@@ -0,0 +1,47 @@
+from utils.name_cache import UserNameCache
+
+def make_cache():
+    cache = UserNameCache()
+    cache.load([('1', 'Alice'), ('2', 'bob'), ('3', 'Alicia'), ('4', 'Carol')])
+    return cache
+
+def test_load_and_get():
+    cache = make_cache()
+    assert cache.get('2') == 'bob'
+    assert cache.get('9') is None
+    assert len(cache) == 4
+
+def test_names_are_sorted_case_insensitively():
+    assert make_cache().names() == ['Alice', 'Alicia', 'bob', 'Carol']
+
+def test_rename_replaces_old_index_entry():
+    cache = make_cache()
+    cache.set('2', 'Zed')
+    assert cache.get('2') == 'Zed'
+    assert cache.find_user_id('bob') is None
+    assert cache.find_user_id('zed') == '2'
+    assert cache.names() == ['Alice', 'Alicia', 'Carol', 'Zed']
+    assert len(cache) == 4
+
+def test_set_adds_new_player():
+    cache = make_cache()
+    cache.set('5', 'Dave')
+    assert cache.find_user_id('Dave') == '5'
+    assert len(cache) == 5
+
+def test_find_user_id_is_exact_and_case_insensitive():
+    cache = make_cache()
+    assert cache.find_user_id('ALICE') == '1'
+    assert cache.find_user_id('Ali') is None
+
+def test_search_returns_prefix_matches_first():
+    cache = make_cache()
+    assert cache.search('ali') == [('1', 'Alice'), ('3', 'Alicia')]
+    # 'o' only appears inside names, so those come from the substring pass
+    assert cache.search('o') == [('2', 'bob'), ('4', 'Carol')]
+    assert cache.search('ar') == [('4', 'Carol')]
+
+def test_search_respects_limit():
+    cache = make_cache()
+    assert len(cache.search('', limit=2)) == 2
+    assert cache.search('a', limit=3) == [('1', 'Alice'), ('3', 'Alicia'), ('4', 'Carol')]
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from database import Database, _timestamp
+
+NOW = datetime.now(timezone.utc)
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(str(tmp_path / 'seasons.db'))
+    database.init_db()
+    database.add_level('Song')
+    database.add_level('Other')
+    yield database
+    database.close()
+
+def make_season(db, starts_at, ends_at, name='Week 1'):
+    season_id = db.create_season(name, starts_at, ends_at)
+    db.add_season_level(season_id, 1)
+    return season_id
+
+def season(db, name='Week 1'):
+    return db.get_season_by_name(name)
+
+def submit_pending(db, attachment_id, score, submitted_at, user_id='1'):
+    db.insert_pending_score(user_id, f"player{user_id}", 1, 'Expert', score,
+                            attachment_id, f"https://cdn.example/{attachment_id}.png", '.png')
+    db.execute('UPDATE pending_scores SET submitted_at = ? WHERE attachment_id = ?',
+               (_timestamp(submitted_at), attachment_id))
+
+def test_scores_in_window_count_towards_open_season(db):
+    make_season(db, NOW - timedelta(hours=1), NOW + timedelta(hours=1))
+    db.insert_score('1', 'player1', 1, 'Expert', 800_000)
+    db.insert_score('1', 'player1', 2, 'Expert', 900_000)
+    assert db.get_season_leaderboard(season(db), 1, 'Expert') == [('player1', 800_000)]
+    assert db.get_season_leaderboard(season(db), 2, 'Expert') == []
+
+def test_scores_outside_window_are_ignored(db):
+    make_season(db, NOW + timedelta(hours=1), NOW + timedelta(hours=2))
+    db.insert_score('1', 'player1', 1, 'Expert', 800_000)
+    assert db.get_season_leaderboard(season(db), 1, 'Expert') == []
+
+def test_lower_score_keeps_season_best(db):
+    make_season(db, NOW - timedelta(hours=1), NOW + timedelta(hours=1))
+    db.insert_score('1', 'player1', 1, 'Expert', 900_000)
+    db.insert_score('1', 'player1', 1, 'Expert', 700_000)
+    assert db.get_season_leaderboard(season(db), 1, 'Expert') == [('player1', 900_000)]
+
+def test_rejected_proof_leaves_season_best(db):
+    make_season(db, NOW - timedelta(hours=1), NOW + timedelta(hours=1))
+    submit_pending(db, 'a1', 900_000, NOW)
+    db.set_verification_result('a1', 'verified', 'hash1')
+    submit_pending(db, 'a2', 950_000, NOW)
+    db.set_verification_result('a2', 'rejected')
+    assert db.get_season_leaderboard(season(db), 1, 'Expert') == [('player1', 900_000)]
+
+def test_close_freezes_results_and_level_names(db):
+    make_season(db, NOW - timedelta(hours=1), NOW + timedelta(hours=1))
+    db.insert_score('1', 'player1', 1, 'Expert', 900_000)
+    db.close_season(season(db)[0])
+    db.execute("UPDATE levels SET level_name = 'Renamed', retired = 1 WHERE level_id = 1")
+    db.insert_score('1', 'player1', 1, 'Expert', 990_000)
+
+    closed = season(db)
+    assert closed[4] == 1
+    assert db.get_season_levels(closed) == [(1, 'Song')]
+    assert db.get_season_leaderboard(closed, 1, 'Expert') == [('player1', 900_000)]
+    assert db.get_user_season_scores(closed, '1') == [(1, 'Song', 'Expert', 900_000)]
+    assert db.execute('SELECT COUNT(*) FROM season_scores')[0][0] == 0
+
+def test_proof_verified_after_auto_close_reaches_season(db):
+    make_season(db, NOW - timedelta(hours=3), NOW - timedelta(hours=1))
+    submit_pending(db, 'a1', 950_000, NOW - timedelta(hours=2))
+    assert db.close_expired_seasons() == ['Week 1']
+
+    db.set_verification_result('a1', 'verified', 'hash1')
+    closed = season(db)
+    assert db.get_season_leaderboard(closed, 1, 'Expert') == [('player1', 950_000)]
+    assert db.get_season_leaderboard(closed, 1, 'Expert', ['verified']) == [('player1', 950_000)]
+    assert db.get_level_leaderboard(1, 'Expert') == [('player1', 950_000)]
+
+def test_late_verification_keeps_higher_frozen_score(db):
+    make_season(db, NOW - timedelta(hours=3), NOW - timedelta(hours=1))
+    db.insert_score('1', 'player1', 1, 'Expert', 980_000, submitted_at=_timestamp(NOW - timedelta(hours=2)))
+    submit_pending(db, 'a1', 950_000, NOW - timedelta(hours=2))
+    db.close_expired_seasons()
+
+    db.set_verification_result('a1', 'verified', 'hash1')
+    assert db.get_season_leaderboard(season(db), 1, 'Expert') == [('player1', 980_000)]
+
+def test_scores_after_manual_close_stay_out(db):
+    make_season(db, NOW - timedelta(hours=1), NOW + timedelta(hours=1))
+    db.close_season(season(db)[0])
+    db.execute('UPDATE seasons SET closed_at = ?', (_timestamp(NOW - timedelta(minutes=30)),))
+
+    db.insert_score('1', 'player1', 1, 'Expert', 900_000)
+    submit_pending(db, 'a1', 950_000, NOW - timedelta(minutes=10), user_id='2')
+    db.set_verification_result('a1', 'verified', 'hash1')
+    assert db.get_season_leaderboard(season(db), 1, 'Expert') == []
@@ -0,0 +1,177 @@
+import asyncio
+import os
+import pytest
+from config import Config
+from constants import DownloadRetry
+from database import Database
+from verification import DownloadError, VerificationError, VerificationJob, VerificationQueue
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 16
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'ATTACHMENT_FOLDER', str(tmp_path / 'attachments'))
+    Config.ensure_attachment_folder()
+    database = Database(str(tmp_path / 'scores.db'))
+    database.init_db()
+    database.add_level('Song')
+    yield database
+    database.close()
+
+def submit(db, attachment_id, score, user_id='1'):
+    db.insert_pending_score(user_id, f"player{user_id}", 1, 'Expert', score,
+                            attachment_id, f"https://cdn.example/{attachment_id}.png", '.png')
+
+def status_of(db, attachment_id):
+    return db.execute('SELECT verification_status FROM pending_scores WHERE attachment_id = ?',
+                      (attachment_id,))[0][0]
+
+def fake_download(content=PNG, fail=None):
+    """Replacement for VerificationQueue._download that writes content or raises fail(job)"""
+    async def download(self, job, path):
+        if fail:
+            error = fail(job)
+            if error:
+                raise error
+        with open(path, 'wb') as file:
+            file.write(content)
+        return f"hash-{content.hex()[:8]}-{len(content)}"
+    return download
+
+def run_job(verifier, job):
+    async def run():
+        verifier._session = object()
+        await verifier._verify(job)
+    asyncio.run(run())
+
+def test_verified_submission_is_promoted(db):
+    submit(db, 'a1', 950_000)
+    assert db.get_level_leaderboard(1, 'Expert') == []
+
+    db.set_verification_result('a1', 'verified', 'hash1')
+    assert db.get_level_leaderboard(1, 'Expert') == [('player1', 950_000)]
+    assert db.execute('SELECT verification_status, attachment_hash FROM scores') == [('verified', 'hash1')]
+
+def test_rejected_proof_leaves_existing_score(db):
+    submit(db, 'a1', 900_000)
+    db.set_verification_result('a1', 'verified', 'hash1')
+    submit(db, 'a2', 950_000)
+    db.set_verification_result('a2', 'rejected')
+
+    assert db.get_level_leaderboard(1, 'Expert') == [('player1', 900_000)]
+    assert status_of(db, 'a2') == 'rejected'
+
+def test_same_hash_is_claimed_only_once(db):
+    submit(db, 'a1', 900_000, user_id='1')
+    submit(db, 'a2', 900_000, user_id='2')
+    assert db.claim_attachment_hash('a1', 'same')
+    # Still pending, yet the second submission of the same file is refused
+    assert not db.claim_attachment_hash('a2', 'same')
+    assert db.claim_attachment_hash('a1', 'same')
+
+def test_rejected_submission_frees_its_hash(db):
+    submit(db, 'a1', 900_000, user_id='1')
+    submit(db, 'a2', 900_000, user_id='2')
+    assert db.claim_attachment_hash('a1', 'same')
+    db.set_verification_result('a1', 'rejected')
+    assert db.claim_attachment_hash('a2', 'same')
+
+def test_concurrent_duplicates_are_not_both_verified(db, monkeypatch):
+    monkeypatch.setattr(VerificationQueue, '_download', fake_download())
+    submit(db, 'a1', 900_000, user_id='1')
+    submit(db, 'a2', 900_000, user_id='2')
+    verifier = VerificationQueue(db, workers=2)
+
+    async def run():
+        verifier._session = object()
+        await asyncio.gather(
+            verifier._verify(VerificationJob('a1', 'https://cdn.example/a1.png', '.png')),
+            verifier._verify(VerificationJob('a2', 'https://cdn.example/a2.png', '.png'))
+        )
+    asyncio.run(run())
+
+    assert sorted([status_of(db, 'a1'), status_of(db, 'a2')]) == ['rejected', 'verified']
+
+def test_failed_content_check_rejects(db, monkeypatch):
+    monkeypatch.setattr(VerificationQueue, '_download', fake_download(content=b'not a png'))
+    submit(db, 'a1', 900_000)
+    run_job(VerificationQueue(db), VerificationJob('a1', 'https://cdn.example/a1.png', '.png'))
+
+    assert status_of(db, 'a1') == 'rejected'
+    assert os.listdir(Config.ATTACHMENT_FOLDER) == []
+
+def test_download_error_leaves_submission_pending(db, monkeypatch):
+    monkeypatch.setattr(VerificationQueue, '_download',
+                        fake_download(fail=lambda job: DownloadError("Download failed: timeout")))
+    monkeypatch.setattr(DownloadRetry, 'BASE_DELAY', 0)
+    submit(db, 'a1', 900_000)
+    verifier = VerificationQueue(db, workers=1)
+
+    async def run():
+        verifier._session = object()
+        job = VerificationJob('a1', 'https://cdn.example/a1.png', '.png')
+        worker = asyncio.create_task(verifier._worker(0))
+        verifier.queue.put_nowait(job)
+        await verifier.queue.join()
+        # The retry puts the job back on the queue after its backoff
+        await asyncio.sleep(0.01)
+        await verifier.queue.join()
+        worker.cancel()
+        await asyncio.gather(worker, *verifier._retries, return_exceptions=True)
+        return job
+    job = asyncio.run(run())
+
+    assert job.attempts >= 2
+    assert status_of(db, 'a1') == 'pending'
+
+def test_expired_url_is_refreshed(db, monkeypatch):
+    expired = 'https://cdn.example/a1.png?ex=old'
+    monkeypatch.setattr(VerificationQueue, '_download', fake_download(
+        fail=lambda job: DownloadError("HTTP 404", 404) if job.url == expired else None
+    ))
+    submit(db, 'a1', 900_000)
+
+    async def refresh(url):
+        return 'https://cdn.example/a1.png?ex=new'
+    run_job(VerificationQueue(db, url_refresher=refresh), VerificationJob('a1', expired, '.png'))
+
+    assert status_of(db, 'a1') == 'verified'
+    assert db.get_pending_submissions() == []
+    assert db.execute("SELECT attachment_url FROM pending_scores") == [('https://cdn.example/a1.png?ex=new',)]
+
+def test_partial_download_is_removed_on_unexpected_error(db, monkeypatch):
+    async def broken_download(self, job, path):
+        with open(path, 'wb') as file:
+            file.write(PNG[:4])
+        raise RuntimeError("connection reset")
+    monkeypatch.setattr(VerificationQueue, '_download', broken_download)
+    submit(db, 'a1', 900_000)
+
+    with pytest.raises(RuntimeError):
+        run_job(VerificationQueue(db), VerificationJob('a1', 'https://cdn.example/a1.png', '.png'))
+    assert os.listdir(Config.ATTACHMENT_FOLDER) == []
+    assert status_of(db, 'a1') == 'pending'
+
+def test_start_requeues_pending_submissions(db, monkeypatch):
+    monkeypatch.setattr(VerificationQueue, '_download', fake_download())
+    submit(db, 'a1', 900_000)
+    submit(db, 'a2', 800_000, user_id='2')
+    db.set_verification_result('a2', 'rejected')
+
+    async def run():
+        verifier = VerificationQueue(db, workers=1)
+        verifier.start()
+        assert verifier.queue.qsize() == 1
+        await verifier.queue.join()
+        await verifier.stop()
+    asyncio.run(run())
+
+    assert status_of(db, 'a1') == 'verified'
+    assert db.get_level_leaderboard(1, 'Expert') == [('player1', 900_000)]
+
+def test_check_attachment_rejects_unsupported_files():
+    class Attachment:
+        filename = 'proof.exe'
+        size = 10
+    with pytest.raises(VerificationError):
+        VerificationQueue.check_attachment(Attachment())
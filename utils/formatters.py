@@ -1,9 +1,12 @@
 from discord import Embed, app_commands
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from constants import EmbedLimits, Difficulty
 
-def create_score_embeds(user_name: str, scores: List[Tuple], continued: bool = False) -> List[Embed]:
+def create_score_embeds(user_name: str, scores: List[Tuple], continued: bool = False,
+                        season: Optional[str] = None) -> List[Embed]:
     """Create Discord embeds for displaying scores"""
+    if season:
+        user_name = f"{user_name} - {season}"
     embeds = []
     current_embed = Embed(
         title=f"Scores for {user_name}" + (" (Continued)" if continued else ""), 
@@ -32,11 +35,12 @@ def create_score_embeds(user_name: str, scores: List[Tuple], continued: bool = F
 
     return embeds
 
-def create_leaderboard_embed(level_name: str, difficulty: str, scores: List[Tuple]) -> Embed:
+def create_leaderboard_embed(level_name: str, difficulty: str, scores: List[Tuple],
+                             season: Optional[str] = None) -> Embed:
     """Create Discord embed for leaderboard display"""
     embed = Embed(
         title=f"{level_name} Leaderboard", 
-        description=f"Difficulty: {difficulty}", 
+        description=f"Difficulty: {difficulty}" + (f" | Season: {season}" if season else ""), 
         color=EmbedLimits.COLOR
     )
     
@@ -71,3 +75,11 @@ def create_difficulty_choices(current: str) -> List[app_commands.Choice[str]]:
         for diff in Difficulty.list()
         if current.lower() in diff.lower()
     ]
+
+def create_season_choices(seasons: List[Tuple], current: str) -> List[app_commands.Choice[str]]:
+    """Create autocomplete choices for season selection"""
+    return [
+        app_commands.Choice(name=season[1] + (" (closed)" if season[4] else ""), value=season[1])
+        for season in seasons
+        if current.lower() in season[1].lower()
+    ][:25]  # Discord limit
@@ -0,0 +1,66 @@
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class UserNameCache:
+    """In-memory index of current player names keyed by user_id"""
+
+    def __init__(self):
+        self._names: Dict[str, str] = {}
+        # Sorted (lowercase name, user_id) pairs for prefix lookups
+        self._index: List[Tuple[str, str]] = []
+
+    def load(self, rows: Iterable[Tuple[str, str]]) -> None:
+        """Replace the cache contents with (user_id, user_name) rows"""
+        self._names = {user_id: user_name for user_id, user_name in rows}
+        self._index = sorted((name.lower(), user_id) for user_id, name in self._names.items())
+
+    def get(self, user_id: str) -> Optional[str]:
+        return self._names.get(user_id)
+
+    def set(self, user_id: str, user_name: str) -> None:
+        """Add a player or update their name"""
+        old_name = self._names.get(user_id)
+        if old_name is not None:
+            position = bisect_left(self._index, (old_name.lower(), user_id))
+            if position < len(self._index) and self._index[position] == (old_name.lower(), user_id):
+                del self._index[position]
+        self._names[user_id] = user_name
+        insort(self._index, (user_name.lower(), user_id))
+
+    def find_user_id(self, user_name: str) -> Optional[str]:
+        """Resolve a name typed by hand to a user_id (case-insensitive)"""
+        key = user_name.lower()
+        position = bisect_left(self._index, (key, ''))
+        if position < len(self._index) and self._index[position][0] == key:
+            return self._index[position][1]
+        return None
+
+    def search(self, current: str, limit: int = 25) -> List[Tuple[str, str]]:
+        """Return (user_id, user_name) pairs matching current, prefix matches first"""
+        key = current.lower()
+        matches = []
+        position = bisect_left(self._index, (key, ''))
+        while position < len(self._index) and len(matches) < limit:
+            name, user_id = self._index[position]
+            if not name.startswith(key):
+                break
+            matches.append(user_id)
+            position += 1
+
+        # Fill remaining slots with names containing current elsewhere
+        if len(matches) < limit and key:
+            seen = set(matches)
+            for name, user_id in self._index:
+                if key in name and user_id not in seen:
+                    matches.append(user_id)
+                    if len(matches) >= limit:
+                        break
+
+        return [(user_id, self._names[user_id]) for user_id in matches]
+
+    def names(self) -> List[str]:
+        """All current names in alphabetical order"""
+        return [self._names[user_id] for _, user_id in self._index]
+
+    def __len__(self) -> int:
+        return len(self._names)
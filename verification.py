@@ -0,0 +1,217 @@
+import asyncio
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional, Set
+import aiohttp
+import discord
+from config import Config
+from constants import AttachmentLimits, DownloadRetry, VerificationStatus
+from database import Database
+
+class VerificationError(Exception):
+    """Custom exception for rejected score attachments"""
+    pass
+
+class DownloadError(Exception):
+    """Raised when an attachment can't be fetched right now, the submission is retried later"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+# A validator receives the path of the downloaded file and raises VerificationError to reject it
+Validator = Callable[[str], None]
+
+# Returns a freshly signed URL for an expired attachment URL, or None if it can't be refreshed
+UrlRefresher = Callable[[str], Awaitable[Optional[str]]]
+
+FILE_SIGNATURES = {
+    '.png': b'\x89PNG\r\n\x1a\n',
+    '.jpg': b'\xff\xd8\xff',
+    '.jpeg': b'\xff\xd8\xff',
+    '.bsor': b'\xd5\xd3\x42\x04',  # BeatLeader replay magic number 0x442d3d5
+}
+
+def check_file_signature(path: str) -> None:
+    """Default validator: make sure the file content matches its extension"""
+    extension = os.path.splitext(path)[1].lower()
+    signature = FILE_SIGNATURES.get(extension)
+    if signature is None:
+        raise VerificationError(f"Unsupported file type: {extension}")
+    with open(path, 'rb') as file:
+        header = file.read(len(signature))
+    if header != signature:
+        raise VerificationError(f"File content does not match its {extension} extension")
+
+@dataclass
+class VerificationJob:
+    attachment_id: str
+    url: str
+    extension: str
+    attempts: int = 0
+
+class VerificationQueue:
+    """Background worker pool that downloads and checks score attachments"""
+
+    def __init__(self, db: Database, validator: Validator = check_file_signature,
+                 workers: int = Config.VERIFICATION_WORKERS,
+                 url_refresher: Optional[UrlRefresher] = None):
+        self.db = db
+        self.validator = validator
+        self.url_refresher = url_refresher
+        self.workers = max(1, workers)
+        self.queue: asyncio.Queue[VerificationJob] = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self._retries: Set[asyncio.Task] = set()
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def start(self) -> None:
+        """Start the worker tasks on the running event loop"""
+        Config.ensure_attachment_folder()
+        self._session = aiohttp.ClientSession()
+        self._tasks = [
+            asyncio.create_task(self._worker(i)) for i in range(self.workers)
+        ]
+        logging.info(f"Verification queue started with {self.workers} worker(s)")
+
+        # Submissions left over from before a restart are still waiting in the database
+        pending = self.db.get_pending_submissions()
+        for attachment_id, url, extension in pending:
+            self.queue.put_nowait(VerificationJob(attachment_id, url, extension))
+        if pending:
+            logging.info(f"Re-queued {len(pending)} pending submission(s) for verification")
+
+    async def stop(self) -> None:
+        """Cancel the workers and scheduled retries and close the HTTP session"""
+        tasks = self._tasks + list(self._retries)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._retries.clear()
+        if self._session:
+            await self._session.close()
+            self._session = None
+        logging.info("Verification queue stopped")
+
+    @staticmethod
+    def attachment_extension(attachment: discord.Attachment) -> str:
+        return os.path.splitext(attachment.filename)[1].lower()
+
+    @staticmethod
+    def check_attachment(attachment: discord.Attachment) -> None:
+        """Cheap checks done before a submission is accepted"""
+        extension = VerificationQueue.attachment_extension(attachment)
+        if extension not in AttachmentLimits.EXTENSIONS:
+            raise VerificationError(
+                f"Unsupported file type. Please attach one of: {', '.join(AttachmentLimits.EXTENSIONS)}"
+            )
+        if attachment.size > AttachmentLimits.MAX_BYTES:
+            raise VerificationError(
+                f"File is too large. The limit is {AttachmentLimits.MAX_BYTES // (1024 * 1024)} MB."
+            )
+
+    def submit(self, attachment: discord.Attachment) -> None:
+        """Queue an attachment for verification without waiting for the result"""
+        self.queue.put_nowait(VerificationJob(
+            attachment_id=str(attachment.id),
+            url=attachment.url,
+            extension=self.attachment_extension(attachment)
+        ))
+        logging.info(f"Attachment {attachment.id} queued for verification ({self.queue.qsize()} pending)")
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._verify(job)
+            except DownloadError as e:
+                logging.warning(f"Could not download attachment {job.attachment_id}: {e}")
+                self._schedule_retry(job)
+            except Exception as e:
+                # Only a failed content check rejects a proof, anything else is retried
+                logging.error(f"Verification worker {worker_id} failed on attachment {job.attachment_id}: {e}")
+                self._schedule_retry(job)
+            finally:
+                self.queue.task_done()
+
+    def _schedule_retry(self, job: VerificationJob) -> None:
+        """Re-queue a job with exponential backoff, leaving its submission pending meanwhile"""
+        job.attempts += 1
+        if job.attempts >= DownloadRetry.MAX_ATTEMPTS:
+            logging.warning(
+                f"Giving up on attachment {job.attachment_id} after {job.attempts} attempts, "
+                f"it stays pending until the next restart"
+            )
+            return
+        delay = min(DownloadRetry.BASE_DELAY * 2 ** (job.attempts - 1), DownloadRetry.MAX_DELAY)
+        task = asyncio.create_task(self._retry_later(job, delay))
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def _retry_later(self, job: VerificationJob, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self.queue.put_nowait(job)
+
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        if os.path.exists(path):
+            os.remove(path)
+
+    async def _verify(self, job: VerificationJob) -> None:
+        path = os.path.join(Config.ATTACHMENT_FOLDER, f"{job.attachment_id}{job.extension}")
+        try:
+            digest = await self._fetch(job, path)
+            # Claiming the hash records it on the submission, so concurrent duplicates can't both pass
+            if not self.db.claim_attachment_hash(job.attachment_id, digest):
+                raise VerificationError("This file was already submitted for another score")
+            # Validators may parse the whole file, so keep them off the event loop
+            await asyncio.get_running_loop().run_in_executor(None, self.validator, path)
+        except VerificationError as e:
+            logging.warning(f"Attachment {job.attachment_id} rejected: {e}")
+            self._remove_file(path)
+            self.db.set_verification_result(job.attachment_id, VerificationStatus.REJECTED.value)
+            return
+        except BaseException:
+            # Don't leave a partial download behind, the job is retried from scratch
+            self._remove_file(path)
+            raise
+
+        self.db.set_verification_result(job.attachment_id, VerificationStatus.VERIFIED.value, digest)
+
+    async def _fetch(self, job: VerificationJob, path: str) -> str:
+        """Download the attachment, refreshing its URL once if the signed URL has expired"""
+        try:
+            return await self._download(job, path)
+        except DownloadError as e:
+            if e.status not in DownloadRetry.EXPIRED_STATUSES or self.url_refresher is None:
+                raise
+            refreshed = await self.url_refresher(job.url)
+            if not refreshed or refreshed == job.url:
+                raise
+            logging.info(f"Refreshed expired URL of attachment {job.attachment_id}")
+            job.url = refreshed
+            self.db.update_attachment_url(job.attachment_id, refreshed)
+            return await self._download(job, path)
+
+    async def _download(self, job: VerificationJob, path: str) -> str:
+        """Stream the attachment to disk in chunks, returning its SHA-256 digest"""
+        digest = hashlib.sha256()
+        received = 0
+        try:
+            async with self._session.get(job.url) as response:
+                if response.status >= 400:
+                    raise DownloadError(f"HTTP {response.status}", response.status)
+                with open(path, 'wb') as file:
+                    async for chunk in response.content.iter_chunked(AttachmentLimits.CHUNK_SIZE):
+                        received += len(chunk)
+                        # The reported size can't be trusted, so enforce the limit while reading
+                        if received > AttachmentLimits.MAX_BYTES:
+                            raise VerificationError("File exceeds the size limit")
+                        digest.update(chunk)
+                        file.write(chunk)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise DownloadError(f"Download failed: {e or type(e).__name__}")
+        return digest.hexdigest()